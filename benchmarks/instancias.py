@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+
+# Flotas de camiones disponibles. Cada tipo de camión es (proporción, carga_max, pedidos_max, dist_max).
+# "estandar" replica los camiones de data/inputs/data_inputs.xlsx.
+FLOTAS = {"estandar": [(1.0, 12, 3, 2)],
+          "mixta": [(0.5, 12, 3, 2), (0.3, 12, 4, 3), (0.2, 8, 2, 2)],
+          "grande": [(0.5, 12, 4, 3), (0.5, 16, 5, 4)]}
+
+# Pedidos por unidad de superficie, similar a los datos del enunciado (15 clientes en un cuadrado de lado 3).
+DENSIDAD = 1.7
+
+
+def generar_pedidos(n_pedidos, distribucion="uniforme", densidad=DENSIDAD, n_clusters=None, carga_max=8, random_state=None):
+    """
+    Genera un DataFrame de pedidos sintético con el formato que recibe Ruteo. El lado del área cuadrada crece con
+    la cantidad de pedidos para mantener la densidad, de modo que la cantidad de vecinos de cada pedido no depende del tamaño.
+
+    Args:
+        n_pedidos (int): Cantidad de pedidos.
+        distribucion (str, optional): "uniforme" para clientes uniformes en el área o "clusters" para clientes
+                                      agrupados alrededor de centros uniformes. Defaults to "uniforme".
+        densidad (float, optional): Pedidos por unidad de superficie. Defaults to DENSIDAD.
+        n_clusters (int, optional): Cantidad de clusters. Defaults to None (uno cada 50 pedidos).
+        carga_max (int, optional): Carga máxima de un pedido. Las cargas son enteros uniformes entre 1 y carga_max. Defaults to 8.
+        random_state (int, optional): Semilla de generación. Defaults to None.
+
+    Returns:
+        pd.DataFrame: Dataframe con las columnas cliente, pedidos, coord_x y coord_y.
+    """
+    rng = np.random.default_rng(random_state)
+    lado = (n_pedidos/densidad)**(1/2)
+
+    if distribucion == "uniforme":
+        x = rng.uniform(0, lado, n_pedidos)
+        y = rng.uniform(0, lado, n_pedidos)
+
+    elif distribucion == "clusters":
+        if n_clusters is None:
+            n_clusters = max(1, n_pedidos//50)
+        centros = rng.uniform(0, lado, (n_clusters, 2))
+        cluster = rng.integers(0, n_clusters, n_pedidos)
+        # La dispersión de cada cluster es tal que el área total ocupada es similar a la de la distribución uniforme.
+        escala = lado/(2*n_clusters**(1/2))
+        x = np.clip(centros[cluster, 0] + rng.normal(0, escala/2, n_pedidos), 0, lado)
+        y = np.clip(centros[cluster, 1] + rng.normal(0, escala/2, n_pedidos), 0, lado)
+
+    else:
+        raise ValueError(f"Distribución desconocida: {distribucion}")
+
+    df_pedidos = pd.DataFrame({"cliente": [f"C{i}" for i in range(n_pedidos)],
+                               "pedidos": rng.integers(1, carga_max + 1, n_pedidos),
+                               "coord_x": x,
+                               "coord_y": y})
+
+    return df_pedidos
+
+
+def generar_camiones(df_pedidos, flota="estandar", capacidad=1.0):
+    """
+    Genera un DataFrame de camiones con el formato que recibe Ruteo, con la cantidad de camiones necesaria para que la
+    capacidad total de la flota sea capacidad veces la carga total de los pedidos.
+
+    Args:
+        df_pedidos (pd.DataFrame): Dataframe de pedidos generado con generar_pedidos().
+        flota (str, optional): Clave de FLOTAS con la composición de la flota. Defaults to "estandar".
+        capacidad (float, optional): Relación entre la capacidad de la flota y la carga total. Defaults to 1.0.
+
+    Returns:
+        pd.DataFrame: Dataframe con las columnas camion, carga_max, pedidos_max y dist_max.
+    """
+    if flota not in FLOTAS:
+        raise ValueError(f"La flota debe ser una de {list(FLOTAS)}")
+
+    tipos = FLOTAS[flota]
+    carga_media = sum(proporcion*carga_max for proporcion, carga_max, _, _ in tipos)
+    n_camiones = max(1, int(np.ceil(capacidad*df_pedidos["pedidos"].sum()/carga_media)))
+
+    filas = []
+    for proporcion, carga_max, pedidos_max, dist_max in tipos:
+        filas += [(carga_max, pedidos_max, dist_max)]*int(round(proporcion*n_camiones))
+
+    df_camiones = pd.DataFrame(filas, columns=["carga_max", "pedidos_max", "dist_max"])
+    df_camiones.insert(0, "camion", np.arange(1, len(df_camiones) + 1))
+
+    return df_camiones
+
+
+def generar_instancia(n_pedidos, distribucion="uniforme", flota="estandar", capacidad=1.0, random_state=None):
+    """
+    Genera una instancia sintética completa y reproducible.
+
+    Args:
+        n_pedidos (int): Cantidad de pedidos.
+        distribucion (str, optional): Distribución de los clientes (ver generar_pedidos()). Defaults to "uniforme".
+        flota (str, optional): Composición de la flota (ver generar_camiones()). Defaults to "estandar".
+        capacidad (float, optional): Relación entre la capacidad de la flota y la carga total. Defaults to 1.0.
+        random_state (int, optional): Semilla de generación. Defaults to None.
+
+    Returns:
+        tuple: DataFrames de pedidos y de camiones.
+    """
+    df_pedidos = generar_pedidos(n_pedidos, distribucion=distribucion, random_state=random_state)
+    df_camiones = generar_camiones(df_pedidos, flota=flota, capacidad=capacidad)
+
+    return (df_pedidos, df_camiones)
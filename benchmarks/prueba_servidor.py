@@ -0,0 +1,161 @@
+"""
+Prueba de punta a punta del servidor de ruteos (logistica/servidor.py) sobre localhost.
+
+Levanta un ServidorRuteo en un puerto libre, envía trabajos concurrentes con resolver_remoto() y verifica:
+    - El orden de los eventos de cada trabajo: "encolado", "inicio", uno o más "progreso" y "resultado".
+    - Que el costo_total_tn de cada resultado coincide con el de correr sa() localmente con los mismos datos y semilla.
+    - Que repetir un trabajo en un servidor de un único proceso reutiliza el Ruteo del caché.
+    - Que un trabajo con datos inválidos y una línea que no es JSON terminan con "error" sin afectar al resto.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.prueba_servidor --pedidos 300 --workers 2
+
+Termina con código 1 si alguna verificación falla.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import pandas as pd
+
+import logistica.metaheuristicas as mh
+from logistica.ruteo import Ruteo
+from logistica.servidor import ServidorRuteo, resolver_remoto
+from .instancias import generar_instancia
+
+
+COSTO_OPORTUNIDAD = 3000
+PRESUPUESTO = 1220
+
+SA_PARAMS = dict(t_inicial=200, t_final=1, k=10, iters=300)
+
+
+def armar_trabajo(n_pedidos, random_state):
+    """
+    Arma un trabajo del servidor sobre una instancia sintética.
+
+    Args:
+        n_pedidos (int): Cantidad de pedidos.
+        random_state (int): Semilla de sa().
+
+    Returns:
+        dict: Trabajo con el formato descripto en logistica/servidor.py.
+    """
+    df_pedidos, df_camiones = generar_instancia(n_pedidos, random_state=1)
+
+    return {"camiones": df_camiones.to_dict("list"),
+            "pedidos": df_pedidos.to_dict("records"),
+            "costo_oportunidad": COSTO_OPORTUNIDAD,
+            "presupuesto": PRESUPUESTO,
+            "params": dict(SA_PARAMS, random_state=random_state)}
+
+
+def resolver_local(trabajo):
+    """
+    Resuelve el trabajo en este proceso, igual que lo haría un proceso del servidor.
+
+    Returns:
+        float: Costo total por tn de la mejor solución.
+    """
+    ruteo = Ruteo.from_frame(pd.DataFrame(trabajo["camiones"]), pd.DataFrame(trabajo["pedidos"]),
+                             costo_oportunidad=trabajo["costo_oportunidad"], presupuesto=trabajo["presupuesto"])
+    ruteo.get_solucion_inicial(mode="simple", random_state=trabajo["params"]["random_state"])
+    best_sol, _ = mh.sa(ruteo, progreso=False, history_mode=None, **trabajo["params"])
+
+    return best_sol.costo_total_tn
+
+
+async def recibir_eventos(trabajo, port):
+    return [evento async for evento in resolver_remoto(trabajo, port=port)]
+
+
+async def enviar_linea(linea, port):
+    # Envía una línea cruda, para probar las que no son JSON válido.
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(linea)
+        await writer.drain()
+        return [json.loads(await reader.readline())]
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def verificar_orden(eventos):
+    """
+    Returns:
+        bool: Si los eventos siguen la secuencia encolado, inicio, progreso (al menos uno) y resultado.
+    """
+    tipos = [evento["evento"] for evento in eventos]
+    return (len(tipos) >= 4 and tipos[:2] == ["encolado", "inicio"] and tipos[-1] == "resultado"
+            and all(tipo == "progreso" for tipo in tipos[2:-1]))
+
+
+async def probar(n_pedidos, workers):
+    """
+    Corre la prueba del servidor.
+
+    Returns:
+        list: Descripción de las verificaciones que fallaron (vacía si todo funcionó).
+    """
+    trabajos = [armar_trabajo(n_pedidos, random_state) for random_state in (1, 2)]
+    esperados = [resolver_local(trabajo) for trabajo in trabajos]
+    fallas = []
+
+    servidor = ServidorRuteo(port=0, max_workers=workers)
+    await servidor.iniciar()
+    try:
+        respuestas = await asyncio.gather(*[recibir_eventos(trabajo, servidor.port) for trabajo in trabajos],
+                                          recibir_eventos({"camiones": []}, servidor.port),
+                                          enviar_linea(b"{no es json\n", servidor.port))
+    finally:
+        await servidor.cerrar()
+
+    # El caché es de cada proceso: con uno solo el trabajo repetido cae en el proceso que ya construyó su Ruteo.
+    servidor = ServidorRuteo(port=0, max_workers=1)
+    await servidor.iniciar()
+    try:
+        primero = await recibir_eventos(trabajos[0], servidor.port)
+        repetido = await recibir_eventos(trabajos[0], servidor.port)
+    finally:
+        await servidor.cerrar()
+
+    for i, (eventos, esperado) in enumerate(zip(respuestas, esperados)):
+        if not verificar_orden(eventos):
+            fallas.append(f"trabajo {i}: orden de eventos inesperado {[evento['evento'] for evento in eventos]}")
+        elif eventos[-1]["costo_total_tn"] != esperado:
+            fallas.append(f"trabajo {i}: costo_total_tn {eventos[-1]['costo_total_tn']} distinto del local {esperado}")
+
+    for nombre, eventos in (("trabajo inválido", respuestas[2]), ("línea no JSON", respuestas[3])):
+        if eventos[-1]["evento"] != "error":
+            fallas.append(f"{nombre}: se esperaba un error y se recibió {eventos[-1]['evento']}")
+
+    if not (verificar_orden(primero) and verificar_orden(repetido)):
+        fallas.append("trabajo repetido: orden de eventos inesperado")
+    elif repetido[-1]["costo_total_tn"] != esperados[0]:
+        fallas.append("trabajo repetido: resultado distinto del local")
+    elif primero[-1]["cache"] or not repetido[-1]["cache"]:
+        fallas.append("trabajo repetido: no se reutilizó el Ruteo del caché")
+
+    return fallas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de punta a punta del servidor de ruteos.")
+    parser.add_argument("--pedidos", type=int, default=300, help="Cantidad de pedidos de cada trabajo.")
+    parser.add_argument("--workers", type=int, default=2, help="Procesos del servidor de los trabajos concurrentes.")
+    args = parser.parse_args(argv)
+
+    fallas = asyncio.run(probar(args.pedidos, args.workers))
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if fallas:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
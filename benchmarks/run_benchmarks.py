@@ -0,0 +1,237 @@
+"""
+Benchmarks de los caminos críticos del solver sobre instancias sintéticas reproducibles.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.run_benchmarks --pedidos 50 500 5000 --salida resultados.json
+    python -m benchmarks.run_benchmarks --pedidos 50 500 --comparar resultados.json
+
+Los resultados se guardan en JSON, con una entrada por instancia, para comparar versiones y detectar regresiones.
+"""
+import argparse
+import copy
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import logistica.metaheuristicas as mh
+from logistica.ruteo import Ruteo
+from .instancias import FLOTAS, generar_instancia
+
+
+COSTO_OPORTUNIDAD = 3000
+PRESUPUESTO = 1220
+
+# Parámetros de sa() por defecto. El historial no se registra para medir sólo la optimización.
+SA_PARAMS = dict(t_inicial=200, t_final=1, k=20, iters=500, temp_mode="linear")
+
+# Parámetros de tabu() por defecto.
+TABU_PARAMS = dict(iters=200, tenure=10, vecindario=20)
+
+# Por encima de esta cantidad de pedidos no se mide la solución inicial "random", que prueba cada pedido en todos los camiones.
+MAX_PEDIDOS_RANDOM = 5000
+
+# Métricas en las que un valor mayor es mejor. En el resto (tiempos y costos) un valor menor es mejor.
+MAYOR_ES_MEJOR = ("vecinos_por_seg", "sa_iters_por_seg", "tabu_iters_por_seg")
+
+
+def medir_instancia(n_pedidos, distribucion, flota, random_state=1, n_vecinos=2000, n_results=20, sa_params=None,
+                    tabu_params=None, max_pedidos_random=MAX_PEDIDOS_RANDOM):
+    """
+    Mide los caminos críticos del solver sobre una instancia sintética.
+
+    Args:
+        n_pedidos (int): Cantidad de pedidos.
+        distribucion (str): Distribución de los clientes.
+        flota (str): Composición de la flota.
+        random_state (int, optional): Semilla de la instancia y de la optimización. Defaults to 1.
+        n_vecinos (int, optional): Cantidad de llamadas a get_vecino() medidas. Defaults to 2000.
+        n_results (int, optional): Cantidad de llamadas a _set_results() medidas. Defaults to 20.
+        sa_params (dict, optional): Argumentos de sa(). Defaults to None (ver SA_PARAMS).
+        tabu_params (dict, optional): Argumentos de tabu(). Defaults to None (ver TABU_PARAMS).
+        max_pedidos_random (int, optional): Cantidad máxima de pedidos para medir la solución inicial "random". Defaults to MAX_PEDIDOS_RANDOM.
+
+    Returns:
+        dict: Resultados de la instancia.
+    """
+    sa_params = dict(SA_PARAMS, **(sa_params or {}))
+    tabu_params = dict(TABU_PARAMS, **(tabu_params or {}))
+    df_pedidos, df_camiones = generar_instancia(n_pedidos, distribucion=distribucion, flota=flota, random_state=random_state)
+
+    resultado = {"pedidos": n_pedidos, "camiones": len(df_camiones), "distribucion": distribucion, "flota": flota,
+                 "random_state": random_state}
+
+    start = time.perf_counter()
+    ruteo = Ruteo(df_camiones, df_pedidos, costo_oportunidad=COSTO_OPORTUNIDAD, presupuesto=PRESUPUESTO)
+    resultado["init_seg"] = time.perf_counter() - start
+    resultado["indice"] = type(ruteo.distancias).__name__
+
+    # Soluciones iniciales, cada una sobre una copia sin asignaciones.
+    for mode in ("simple", "random", "greedy"):
+        if mode == "random" and n_pedidos > max_pedidos_random:
+            resultado[f"sol_inicial_{mode}_seg"] = None
+            resultado[f"sol_inicial_{mode}_costo"] = None
+            continue
+        ruteo_mode = copy.deepcopy(ruteo)
+        start = time.perf_counter()
+        ruteo_mode.get_solucion_inicial(mode=mode, random_state=random_state)
+        resultado[f"sol_inicial_{mode}_seg"] = time.perf_counter() - start
+        resultado[f"sol_inicial_{mode}_costo"] = ruteo_mode.costo_total_tn
+
+    # Los vecinos y el recocido parten de la solución inicial simple, que es determinística.
+    ruteo.get_solucion_inicial(mode="simple")
+
+    # Generación y aplicación de vecinos sobre una copia de la solución inicial.
+    ruteo_vecinos = copy.deepcopy(ruteo)
+    random.seed(random_state)
+    start = time.perf_counter()
+    for _ in range(n_vecinos):
+        ruteo_vecinos.get_vecino()
+    resultado["vecinos_por_seg"] = n_vecinos/(time.perf_counter() - start)
+
+    # Recálculo completo de resultados.
+    start = time.perf_counter()
+    for _ in range(n_results):
+        ruteo_vecinos._set_results()
+    resultado["set_results_seg"] = (time.perf_counter() - start)/n_results
+
+    # Recocido simulado completo.
+    start = time.perf_counter()
+    best_sol, history = mh.sa(ruteo, random_state=random_state, progreso=False, history_mode=None, **sa_params)
+    resultado["sa_seg"] = time.perf_counter() - start
+    resultado["sa_iters"] = history["iters"]
+    resultado["sa_iters_por_seg"] = history["iters"]/resultado["sa_seg"]
+    resultado["sa_costo_inicial"] = ruteo.costo_total_tn
+    resultado["sa_costo_final"] = best_sol.costo_total_tn
+    
+    # Búsqueda tabú desde la misma solución inicial.
+    start = time.perf_counter()
+    best_sol, history = mh.tabu(ruteo, random_state=random_state, progreso=False, history_mode=None, **tabu_params)
+    resultado["tabu_seg"] = time.perf_counter() - start
+    resultado["tabu_iters"] = history["iters"]
+    resultado["tabu_iters_por_seg"] = history["iters"]/resultado["tabu_seg"]
+    resultado["tabu_costo_final"] = best_sol.costo_total_tn
+
+    return resultado
+
+
+def metadatos(sa_params=None, tabu_params=None):
+    """
+    Args:
+        sa_params (dict, optional): Argumentos de sa() usados. Defaults to None (ver SA_PARAMS).
+        tabu_params (dict, optional): Argumentos de tabu() usados. Defaults to None (ver TABU_PARAMS).
+
+    Returns:
+        dict: Versión del código y del entorno en que se corrieron los benchmarks.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {"fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "plataforma": platform.platform(),
+            "sa_params": dict(SA_PARAMS, **(sa_params or {})),
+            "tabu_params": dict(TABU_PARAMS, **(tabu_params or {}))}
+
+
+def comparar(actual, base, tolerancia=0.2):
+    """
+    Compara dos corridas de benchmarks instancia por instancia.
+
+    Args:
+        actual (dict): Resultados de la corrida actual.
+        base (dict): Resultados de la corrida de referencia.
+        tolerancia (float, optional): Empeoramiento relativo a partir del cual una métrica se considera una regresión. Defaults to 0.2.
+
+    Returns:
+        list: Regresiones encontradas, con la instancia, la métrica, el valor base y el actual.
+    """
+    clave = lambda r: (r["pedidos"], r["distribucion"], r["flota"], r["random_state"])
+    base_por_instancia = {clave(r): r for r in base["resultados"]}
+
+    regresiones = []
+    for r in actual["resultados"]:
+        r_base = base_por_instancia.get(clave(r))
+        if r_base is None:
+            continue
+        for metrica, valor in r.items():
+            valor_base = r_base.get(metrica)
+            if not isinstance(valor, (int, float)) or not isinstance(valor_base, (int, float)) or valor_base == 0:
+                continue
+            if metrica in ("pedidos", "camiones", "random_state", "sa_iters", "tabu_iters"):
+                continue
+            cambio = (valor - valor_base)/abs(valor_base)
+            if metrica in MAYOR_ES_MEJOR:
+                cambio = -cambio
+            if cambio > tolerancia:
+                regresiones.append({"instancia": clave(r), "metrica": metrica, "base": valor_base, "actual": valor})
+
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del solver de ruteo sobre instancias sintéticas.")
+    parser.add_argument("--pedidos", type=int, nargs="+", default=[50, 500, 2000, 20000], help="Tamaños de instancia.")
+    parser.add_argument("--distribuciones", nargs="+", default=["uniforme", "clusters"], choices=["uniforme", "clusters"])
+    parser.add_argument("--flotas", nargs="+", default=["estandar", "mixta"], choices=list(FLOTAS))
+    parser.add_argument("--random-state", type=int, default=1)
+    parser.add_argument("--iters", type=int, default=SA_PARAMS["iters"], help="Iteraciones de sa() por temperatura.")
+    parser.add_argument("--k", type=int, default=SA_PARAMS["k"], help="Cantidad de temperaturas de sa().")
+    parser.add_argument("--tabu-iters", type=int, default=TABU_PARAMS["iters"], help="Iteraciones de tabu().")
+    parser.add_argument("--max-pedidos-random", type=int, default=MAX_PEDIDOS_RANDOM,
+                        help="Cantidad máxima de pedidos para medir la solución inicial random.")
+    parser.add_argument("--salida", type=Path, default=None, help="Archivo JSON de resultados. Por defecto se imprimen.")
+    parser.add_argument("--comparar", type=Path, default=None, help="JSON de una corrida anterior contra el que comparar.")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Empeoramiento relativo tolerado al comparar.")
+    args = parser.parse_args(argv)
+
+    # Copias locales: los valores por defecto del módulo no se modifican.
+    sa_params = dict(SA_PARAMS, iters=args.iters, k=args.k)
+    tabu_params = dict(TABU_PARAMS, iters=args.tabu_iters)
+
+    resultados = []
+    for n_pedidos in args.pedidos:
+        for distribucion in args.distribuciones:
+            for flota in args.flotas:
+                resultado = medir_instancia(n_pedidos, distribucion, flota, random_state=args.random_state,
+                                            sa_params=sa_params, tabu_params=tabu_params,
+                                            max_pedidos_random=args.max_pedidos_random)
+                resultados.append(resultado)
+                print(f"{n_pedidos:>6} {distribucion:<9} {flota:<9} init {resultado['init_seg']:.3f}s  "
+                      f"vecinos {resultado['vecinos_por_seg']:.0f}/s  sa {resultado['sa_iters_por_seg']:.0f} it/s  "
+                      f"costo {resultado['sa_costo_final']}  tabu {resultado['tabu_iters_por_seg']:.0f} it/s  "
+                      f"costo {resultado['tabu_costo_final']}", file=sys.stderr)
+
+    salida = {"metadatos": metadatos(sa_params, tabu_params), "resultados": resultados}
+
+    if args.salida is not None:
+        args.salida.write_text(json.dumps(salida, indent=2))
+    else:
+        print(json.dumps(salida, indent=2))
+
+    if args.comparar is not None:
+        regresiones = comparar(salida, json.loads(args.comparar.read_text()), tolerancia=args.tolerancia)
+        for regresion in regresiones:
+            print(f"Regresión en {regresion['instancia']} {regresion['metrica']}: "
+                  f"{regresion['base']:.4g} -> {regresion['actual']:.4g}", file=sys.stderr)
+        return 1 if regresiones else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
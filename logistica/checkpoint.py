@@ -0,0 +1,51 @@
+import json
+import os
+import random
+import numpy as np
+
+
+def guardar_checkpoint(path, params, arrays, valores):
+    """
+    Guarda un checkpoint compacto en formato npz junto con el estado del generador del módulo random.
+    El archivo se escribe primero en un temporal que luego lo reemplaza, para que un corte durante la escritura
+    no deje un checkpoint corrupto.
+
+    Args:
+        path (str or Path): Archivo del checkpoint.
+        params (dict): Parámetros serializables en JSON (por ejemplo los argumentos de la metaheurística).
+        arrays (dict): Arrays de NumPy a guardar.
+        valores (dict): Valores escalares serializables en JSON.
+    """
+    version, rng, gauss = random.getstate()
+    valores = dict(valores, rng_version=version, rng_gauss=gauss)
+
+    path = str(path)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f,
+                 params=np.array(json.dumps(params)),
+                 valores=np.array(json.dumps(valores)),
+                 rng=np.array(rng, dtype=np.int64),
+                 **arrays)
+    os.replace(tmp, path)
+
+
+def cargar_checkpoint(path):
+    """
+    Carga un checkpoint generado con guardar_checkpoint() y restaura el estado del generador del módulo random.
+
+    Args:
+        path (str or Path): Archivo del checkpoint.
+
+    Returns:
+        tuple: Parámetros, arrays y valores guardados.
+    """
+    with np.load(str(path)) as datos:
+        params = json.loads(str(datos["params"]))
+        valores = json.loads(str(datos["valores"]))
+        rng = tuple(datos["rng"].tolist())
+        arrays = {clave: datos[clave] for clave in datos.files if clave not in ("params", "valores", "rng")}
+
+    random.setstate((valores.pop("rng_version"), rng, valores.pop("rng_gauss")))
+
+    return (params, arrays, valores)
@@ -1,3 +1,10 @@
+import copy
+
+# Decimales con los que se redondean las cargas y costos acumulados. Evita que el error de punto flotante
+# de sumar y restar cargas cambie el tramo de costo de un camión (por ejemplo 6.499999999 en lugar de 6.5).
+DECIMALES = 9
+
+
 class Camion(object):
     """ 
     La clase Camión permite generar instancias de camiones con sus respectivas características:
@@ -8,16 +15,66 @@ class Camion(object):
         
     Dentro de pedidos_asignados se guardan todos los pedidos que se agregan al camión acompañados del ix del pedido.
     Se puede acceder fácilmente a la carga total actual del camion y cantidad de pedidos con esos atributos.
+    
+    Si se le asigna una MatrizDistancias en distancias (lo hace Ruteo al cargar los datos) los chequeos de
+    distancia se resuelven buscando en la matriz por la posición pos de cada pedido en lugar de calcularlas.
+    El parámetro pos indica la posición del camión dentro del Ruteo.
+    
+    Si además se le asignan mascaras (una por pedido, con los bits de los pedidos a distancia menor o igual a dist_max)
+    el camión mantiene en mascara_compatibles el AND de las máscaras de sus pedidos asignados. Así el chequeo de distancia
+    de un nuevo pedido es un único test de bit.
+    
+    Los atributos se declaran en __slots__ para reducir la memoria de cada instancia. Al copiar un camión (clone() o
+    copy.deepcopy()) se comparten las distancias y máscaras, y sólo se copian los datos de su asignación.
     """
     
-    def __init__(self, ix, carga_max, pedidos_max, dist_max):
+    __slots__ = ("ix", "pos", "carga_max", "pedidos_max", "dist_max", "distancias", "mascaras", "pedidos_asignados",
+                 "carga_total", "cantidad_pedidos", "costo", "mascara_compatibles")
+    
+    def __init__(self, ix, carga_max, pedidos_max, dist_max, distancias=None, pos=None, mascaras=None):
         self.ix = ix
+        self.pos = pos
         self.carga_max = carga_max
         self.pedidos_max = pedidos_max
         self.dist_max = dist_max
+        self.distancias = distancias
+        self.mascaras = mascaras
         self.pedidos_asignados = {}
         self.carga_total = 0
         self.cantidad_pedidos = 0
+        self.costo = self.costo_carga(0)
+        # Con todos los bits en 1 (-1) un camión vacío es compatible con cualquier pedido.
+        self.mascara_compatibles = -1
+    
+    def clone(self, pedidos=None):
+        """
+        Copia el camión compartiendo sus datos estáticos (distancias y máscaras).
+
+        Args:
+            pedidos (dict, optional): Diccionario de pedidos de la copia por ix. Los pedidos asignados de la copia se toman
+                                      de aquí, de modo que referencien a los pedidos copiados del Ruteo. Defaults to None
+                                      (la copia referencia los mismos pedidos que el camión original).
+
+        Returns:
+            Camion: Copia del camión.
+        """
+        nuevo = Camion.__new__(Camion)
+        for attr in Camion.__slots__:
+            setattr(nuevo, attr, getattr(self, attr))
+        
+        if pedidos is None:
+            nuevo.pedidos_asignados = dict(self.pedidos_asignados)
+        else:
+            nuevo.pedidos_asignados = {ix: pedidos[ix] for ix in self.pedidos_asignados}
+        
+        return nuevo
+    
+    def __deepcopy__(self, memo):
+        # Los pedidos asignados se copian a través de memo, así referencian a los mismos pedidos que la copia del Ruteo.
+        nuevo = self.clone()
+        memo[id(self)] = nuevo
+        nuevo.pedidos_asignados = {ix: copy.deepcopy(pedido, memo) for ix, pedido in self.pedidos_asignados.items()}
+        return nuevo
         
         
     def __str__(self):
@@ -94,8 +151,14 @@ class Camion(object):
             - Devuelve True si sumando el nuevo pedido no excedemos la distancia máxima para ningún pedido.
             - Devuelve False si sumando el nuevo pedido excedemos la distancia máxima en al menos un pedido.
         """
-        dist_check = [pedido.distancia(other) <= self.dist_max for other in self.get_pedidos()]
-        return all(dist_check)
+        if self.mascaras is not None:
+            return (self.mascara_compatibles >> pedido.pos) & 1 == 1
+        
+        if self.distancias is None:
+            return all(pedido.distancia(other) <= self.dist_max for other in self.pedidos_asignados.values())
+        
+        fila = self.distancias.fila(pedido.pos)
+        return all(fila[other.pos] <= self.dist_max for other in self.pedidos_asignados.values())
     
     def check_nuevo_pedido(self, pedido):
         """ 
@@ -122,17 +185,28 @@ class Camion(object):
         """    
         
         # Revisamos que el pedido no esté asignado previamente al camión.
-        if pedido.ix not in self.get_ix_pedidos():
+        if pedido.ix not in self.pedidos_asignados:
             
             # Creamos una lista de ixs reemplazables por el pedido nuevo.
             ix_pedidos_reemplazables = []
+            pedidos = self.get_pedidos()
+            
+            # Distancias del nuevo pedido contra cada pedido asignado, calculadas una sola vez.
+            if self.mascaras is not None:
+                mascara = self.mascaras[pedido.pos]
+                dist_ok = [(mascara >> pedido_restante.pos) & 1 == 1 for pedido_restante in pedidos]
+            elif self.distancias is None:
+                dist_ok = [pedido.distancia(pedido_restante) <= self.dist_max for pedido_restante in pedidos]
+            else:
+                fila = self.distancias.fila(pedido.pos)
+                dist_ok = [fila[pedido_restante.pos] <= self.dist_max for pedido_restante in pedidos]
             
             # Para cada uno de los pedidos ya asignado al camión se hace el chequeo.
-            for pedido_original in self.get_pedidos():
+            for i, pedido_original in enumerate(pedidos):
                 # Calculamos la carga nueva que tendría el camión con el reemplazo de pedidos.
                 nueva_carga = self.carga_total + pedido.carga - pedido_original.carga
                 # Generamos una lista de bool revisando si el nuevo pedido incorporado supera la distancia máxima con los pedidos restantes en el camión.
-                distancias = [pedido.distancia(pedido_restante) <= self.dist_max for pedido_restante in self.get_pedidos() if pedido_restante.ix != pedido_original.ix]
+                distancias = [ok for j, ok in enumerate(dist_ok) if j != i]
                 
                 # Si la nueva carga no supera la carga máxima y las distancias con pedidos restantes son todas menores al máximo
                 # agregamos el ix del pedido a reemplazar en la lista.
@@ -155,8 +229,11 @@ class Camion(object):
             # Se agrega el pedido al diccionario de pedidos asignados de este camión.
             self.pedidos_asignados[pedido.ix] = pedido
             # Se actualiza la carga total y cantidad de pedidos totales.
-            self.carga_total += pedido.carga
+            self.carga_total = round(self.carga_total + pedido.carga, DECIMALES)
             self.cantidad_pedidos += 1
+            self.costo = self.costo_carga(self.carga_total)
+            if self.mascaras is not None:
+                self.mascara_compatibles &= self.mascaras[pedido.pos]
             # Se actualizan las propiedades del pedido agregado.
             pedido.asignado = True
             pedido.camion_ix = self.ix
@@ -179,35 +256,56 @@ class Camion(object):
         de pedidos asignados.
         """
         # Confirma que el pedido esté asignado a este camión.
-        if pedido_ix in self.get_ix_pedidos():
+        if pedido_ix in self.pedidos_asignados:
             # Actualiza los parámetros del pedido.
             self.get_pedido(pedido_ix).asignado = False
             self.get_pedido(pedido_ix).camion_ix = None
             # Actualiza los parámetros del camión.
-            self.carga_total -= self.pedidos_asignados.get(pedido_ix).carga
+            self.carga_total = round(self.carga_total - self.pedidos_asignados.get(pedido_ix).carga, DECIMALES)
             self.cantidad_pedidos -= 1
+            self.costo = self.costo_carga(self.carga_total)
             # Elimina el pedido.
             self.pedidos_asignados.pop(pedido_ix)
+            # Recalcula la máscara de compatibles con los pedidos restantes.
+            if self.mascaras is not None:
+                self._set_mascara_compatibles()
         else:
             print(f"El pedido {pedido_ix} no está en el camión {self.ix}")    
 
     
+    def _set_mascara_compatibles(self):
+        mascara = -1
+        for pedido in self.pedidos_asignados.values():
+            mascara &= self.mascaras[pedido.pos]
+        self.mascara_compatibles = mascara
+    
     def get_costo(self):
         """
         Returns:
-            int: Costo del camión en función de la carga total.
+            int: Costo del camión en función de la carga total. Se actualiza al agregar o eliminar pedidos.
+        """   
+        return self.costo
+    
+    @staticmethod
+    def costo_carga(carga):
+        """
+        Args:
+            carga (int or float): Carga total de un camión.
+
+        Returns:
+            int: Costo de un camión con esa carga total.
         """   
          
-        if self.carga_total == 0:
+        if carga == 0:
             costo = 5000
-        elif self.carga_total <= 4:
+        elif carga <= 4:
             costo = 5600
-        elif self.carga_total > 4 and self.carga_total < 6.5:
-            costo = 1400*self.carga_total
-        elif self.carga_total >= 6.5 and self.carga_total < 9.5:
-            costo = 1200*self.carga_total
+        elif carga > 4 and carga < 6.5:
+            costo = 1400*carga
+        elif carga >= 6.5 and carga < 9.5:
+            costo = 1200*carga
         else:
-            costo = 1000*self.carga_total
+            costo = 1000*carga
                 
         return costo 
     
@@ -228,6 +326,8 @@ class Camion(object):
         self.pedidos_asignados.clear()
         self.carga_total = 0
         self.cantidad_pedidos = 0
+        self.costo = self.costo_carga(0)
+        self.mascara_compatibles = -1
         
         
         
@@ -242,17 +342,38 @@ class Pedido(object):
         - carga: Carga del pedido.
         
     Si el pedido está asignado dicho parámetro toma valor True. El parámetro camion_ix indica el ix del camión al 
-    que el pedido está asignado.
+    que el pedido está asignado. El parámetro pos indica la posición del pedido dentro del Ruteo (fila de la matriz de distancias).
+    
+    Los atributos se declaran en __slots__. Todos son valores inmutables, por lo que copiar un pedido (clone() o
+    copy.deepcopy()) sólo copia sus referencias.
     """
     
-    def __init__(self, ix, x, y, carga):
+    __slots__ = ("ix", "x", "y", "carga", "pos", "asignado", "camion_ix")
+    
+    def __init__(self, ix, x, y, carga, pos=None):
         self.ix = ix
         self.x = x
         self.y = y
         self.carga = carga
+        self.pos = pos
         self.asignado = False
         self.camion_ix = None
         
+    def clone(self):
+        """
+        Returns:
+            Pedido: Copia del pedido.
+        """
+        nuevo = Pedido.__new__(Pedido)
+        for attr in Pedido.__slots__:
+            setattr(nuevo, attr, getattr(self, attr))
+        return nuevo
+    
+    def __deepcopy__(self, memo):
+        nuevo = self.clone()
+        memo[id(self)] = nuevo
+        return nuevo
+        
     def __str__(self):
         return f'Pedido {self.ix}\nCarga {self.carga} tn\nAsignado {self.asignado}\nAsignado a Camion {self.camion_ix}'
     
@@ -285,4 +406,35 @@ class Pedido(object):
         dist = ((self.x - other.x)**2 + (self.y - other.y)**2)**(1/2)
         return round(dist, 1)
     
-    
\ No newline at end of file
+        
+    
+    
+    
+class Movimiento(object):
+    """ 
+    La clase Movimiento representa una modificación de vecindario sobre un Ruteo, que puede aplicarse y revertirse:
+        - tipo: Tipo de movimiento.
+            - "reubicar": Un pedido asignado pasa directamente a otro camión.
+            - "insertar": Un pedido no asignado entra directamente a un camión.
+            - "intercambiar": Dos pedidos asignados intercambian sus camiones.
+            - "reemplazar": Un pedido no asignado ocupa el lugar de un pedido asignado, que queda sin asignar.
+            - "nulo": No se modifica la solución.
+        - cambios: Lista de tuplas (ix_pedido, ix_camion_origen, ix_camion_destino). None indica sin asignar.
+    """
+    
+    def __init__(self, tipo, cambios=None):
+        self.tipo = tipo
+        self.cambios = cambios if cambios is not None else []
+        
+    def __str__(self):
+        return f'Movimiento {self.tipo}\nCambios {self.cambios}'
+    
+    def __repr__(self):
+        return f'Movimiento {self.tipo}\nCambios {self.cambios}'
+    
+    def inverso(self):
+        """
+        Returns:
+            Movimiento: Movimiento que deshace los cambios de la instancia.
+        """
+        return Movimiento(self.tipo, [(ix_pedido, destino, origen) for ix_pedido, origen, destino in reversed(self.cambios)])
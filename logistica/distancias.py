@@ -0,0 +1,224 @@
+import math
+import numpy as np
+
+
+# Las distancias se redondean a 1 decimal, por lo que una distancia redondeada menor o igual a un radio
+# puede corresponder a una distancia real de hasta radio + 0.05.
+HOLGURA_REDONDEO = 0.05
+
+
+def distancias_redondeadas(x1, y1, x2, y2):
+    """
+    Calcula distancias euclídeas redondeadas a 1 decimal con la misma semántica que Pedido.distancia(),
+    es decir round(dist, 1). Los argumentos se combinan según las reglas de broadcasting de NumPy.
+
+    Args:
+        x1, y1 (np.ndarray): Coordenadas de los primeros pedidos.
+        x2, y2 (np.ndarray): Coordenadas de los segundos pedidos.
+
+    Returns:
+        np.ndarray: Distancias redondeadas.
+    """
+    dx = np.asarray(x1, dtype=float) - np.asarray(x2, dtype=float)
+    dy = np.asarray(y1, dtype=float) - np.asarray(y2, dtype=float)
+    dist = np.sqrt(dx**2 + dy**2)
+    redondeadas = np.round(dist, 1)
+
+    # np.round y round() sólo pueden diferir en distancias muy cercanas a un empate (x.x5).
+    # Esos pares se recalculan con la misma fórmula que Pedido.distancia().
+    frac = dist*10 - np.floor(dist*10)
+    empates = np.abs(frac - 0.5) < 1e-6
+    if empates.any():
+        for ix, dx_i, dy_i in zip(zip(*np.nonzero(empates)), dx[empates].tolist(), dy[empates].tolist()):
+            redondeadas[ix] = round((dx_i**2 + dy_i**2)**(1/2), 1)
+
+    return redondeadas
+
+
+class MatrizDistancias(object):
+    """
+    La clase MatrizDistancias precalcula una única vez las distancias entre todos los pares de pedidos de un ruteo:
+        - matriz: Matriz (n x n) de distancias indexada por la posición pos de cada pedido.
+
+    Las distancias respetan el mismo redondeo que Pedido.distancia(), es decir round(dist, 1), de modo que
+    los chequeos de distancia máxima dan exactamente el mismo resultado que calculándolas par a par.
+    """
+
+    def __init__(self, x, y):
+        self.matriz = self._calcular(x, y)
+
+    def __len__(self):
+        return len(self.matriz)
+
+    def _calcular(self, x, y):
+        """
+        Calcula la matriz de distancias redondeadas a 1 decimal.
+
+        Args:
+            x (list or np.ndarray): Coordenadas x de los pedidos ordenadas por pos.
+            y (list or np.ndarray): Coordenadas y de los pedidos ordenadas por pos.
+
+        Returns:
+            np.ndarray: Matriz de distancias (n x n).
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        return distancias_redondeadas(x[:, None], y[:, None], x[None, :], y[None, :])
+
+    def distancia(self, i, j):
+        """
+        Args:
+            i (int): Posición del primer pedido.
+            j (int): Posición del segundo pedido.
+
+        Returns:
+            float: Distancia entre ambos pedidos.
+        """
+        return self.matriz[i, j]
+
+    def fila(self, i):
+        """
+        Args:
+            i (int): Posición del pedido.
+
+        Returns:
+            np.ndarray: Distancias del pedido i contra todos los pedidos, indexables por posición.
+        """
+        return self.matriz[i]
+
+    def vecinos(self, radio):
+        """
+        Args:
+            radio (int or float): Distancia máxima.
+
+        Returns:
+            list: Para cada pedido, array con las posiciones de los otros pedidos a distancia menor o igual a radio.
+        """
+        vecinos = []
+        for i, fila in enumerate(self.matriz):
+            cercanos = np.flatnonzero(fila <= radio)
+            vecinos.append(cercanos[cercanos != i].astype(np.int32))
+        return vecinos
+
+    def mascaras(self, radio):
+        """
+        Args:
+            radio (int or float): Distancia máxima.
+
+        Returns:
+            list: Para cada pedido, un entero cuyo bit j vale 1 si el pedido j está a distancia menor o igual a radio
+                  (incluyendo al propio pedido).
+        """
+        return [int.from_bytes(np.packbits(fila <= radio, bitorder="little").tobytes(), "little") for fila in self.matriz]
+
+
+class GrillaDistancias(object):
+    """
+    La clase GrillaDistancias es un índice espacial de grilla uniforme sobre las coordenadas de los pedidos,
+    alternativo a MatrizDistancias para instancias grandes. No guarda ninguna matriz (n x n):
+        - tamano: Lado de cada celda de la grilla (radio más la holgura de redondeo).
+        - celdas: Diccionario con las posiciones de los pedidos de cada celda.
+
+    Las búsquedas por radio sólo revisan las celdas cercanas y las distancias se calculan al consultarlas,
+    con el mismo redondeo que Pedido.distancia().
+    """
+
+    def __init__(self, x, y, radio):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.tamano = max(float(radio), 0) + HOLGURA_REDONDEO
+        self.celdas = self._load_celdas()
+
+    def __len__(self):
+        return len(self.x)
+
+    def _load_celdas(self):
+        """
+        Returns:
+            dict: Diccionario con un array de posiciones de pedidos para cada celda (cx, cy).
+        """
+        if len(self) == 0:
+            return {}
+
+        cx = np.floor(self.x/self.tamano).astype(np.int64)
+        cy = np.floor(self.y/self.tamano).astype(np.int64)
+        orden = np.lexsort((cy, cx))
+        claves = np.stack([cx[orden], cy[orden]], axis=1)
+
+        # Cortes donde cambia la celda dentro del orden lexicográfico.
+        cortes = np.flatnonzero(np.any(np.diff(claves, axis=0) != 0, axis=1)) + 1
+        inicios = np.concatenate([[0], cortes])
+
+        return {(int(claves[inicio, 0]), int(claves[inicio, 1])): grupo.astype(np.int32)
+                for inicio, grupo in zip(inicios.tolist(), np.split(orden, cortes))}
+
+    def _celda(self, i):
+        return (math.floor(self.x[i]/self.tamano), math.floor(self.y[i]/self.tamano))
+
+    def distancia(self, i, j):
+        """
+        Args:
+            i (int): Posición del primer pedido.
+            j (int): Posición del segundo pedido.
+
+        Returns:
+            float: Distancia entre ambos pedidos.
+        """
+        return round(((float(self.x[i]) - float(self.x[j]))**2 + (float(self.y[i]) - float(self.y[j]))**2)**(1/2), 1)
+
+    def fila(self, i):
+        """
+        Args:
+            i (int): Posición del pedido.
+
+        Returns:
+            _FilaGrilla: Objeto indexable por posición (entero o array) que calcula las distancias del pedido i.
+        """
+        return _FilaGrilla(self, i)
+
+    def candidatos(self, i, radio):
+        """
+        Args:
+            i (int): Posición del pedido.
+            radio (int or float): Distancia máxima.
+
+        Returns:
+            np.ndarray: Posiciones de los pedidos de las celdas que pueden estar a distancia menor o igual a radio.
+        """
+        cx, cy = self._celda(i)
+        anillos = max(1, math.ceil((radio + HOLGURA_REDONDEO)/self.tamano))
+        grupos = [self.celdas[(cx + dx, cy + dy)]
+                  for dx in range(-anillos, anillos + 1)
+                  for dy in range(-anillos, anillos + 1)
+                  if (cx + dx, cy + dy) in self.celdas]
+        return np.sort(np.concatenate(grupos))
+
+    def vecinos(self, radio):
+        """
+        Args:
+            radio (int or float): Distancia máxima.
+
+        Returns:
+            list: Para cada pedido, array con las posiciones de los otros pedidos a distancia menor o igual a radio.
+        """
+        vecinos = []
+        for i in range(len(self)):
+            candidatos = self.candidatos(i, radio)
+            cercanos = candidatos[self.fila(i)[candidatos] <= radio]
+            vecinos.append(cercanos[cercanos != i].astype(np.int32))
+        return vecinos
+
+
+class _FilaGrilla(object):
+    """
+    Fila de distancias de un pedido en una GrillaDistancias, calculada al indexarla.
+    """
+
+    def __init__(self, grilla, i):
+        self.grilla = grilla
+        self.i = i
+
+    def __getitem__(self, j):
+        if np.ndim(j) == 0:
+            return self.grilla.distancia(self.i, j)
+        return distancias_redondeadas(self.grilla.x[self.i], self.grilla.y[self.i], self.grilla.x[j], self.grilla.y[j])
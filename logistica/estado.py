@@ -0,0 +1,191 @@
+import numpy as np
+from .componentes import DECIMALES
+
+
+def costo_cargas(cargas):
+    """
+    Versión vectorizada de Camion.costo_carga().
+
+    Args:
+        cargas (np.ndarray): Cargas totales de camiones.
+
+    Returns:
+        np.ndarray: Costo de cada camión en función de su carga total.
+    """
+    cargas = np.asarray(cargas, dtype=float)
+    condiciones = [cargas == 0, cargas <= 4, cargas < 6.5, cargas < 9.5]
+    valores = [5000, 5600, 1400*cargas, 1200*cargas]
+    return np.select(condiciones, valores, default=1000*cargas)
+
+
+class EstadoRuteo(object):
+    """
+    La clase EstadoRuteo representa una solución de ruteo de manera compacta con arrays de NumPy.
+
+    Datos estáticos, compartidos entre todas las copias del estado:
+        - ix_pedidos: Lista de identificadores de pedidos ordenados por posición.
+        - x, y, carga: Coordenadas y carga de cada pedido.
+        - ix_camiones: Lista de identificadores de camiones ordenados por posición.
+        - carga_max, pedidos_max, dist_max: Restricciones de cada camión.
+
+    Datos de la solución, propios de cada copia:
+        - asignacion: Posición del camión al que está asignado cada pedido (-1 si no está asignado).
+        - carga_camiones: Carga total de cada camión.
+        - cantidad_camiones: Cantidad de pedidos de cada camión.
+
+    Copiar una solución implica sólo copiar los arrays de la asignación.
+    """
+
+    def __init__(self, ix_pedidos, x, y, carga, ix_camiones, carga_max, pedidos_max, dist_max, asignacion=None):
+        self.ix_pedidos = list(ix_pedidos)
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.carga = np.asarray(carga, dtype=float)
+        self.ix_camiones = list(ix_camiones)
+        self.carga_max = np.asarray(carga_max, dtype=float)
+        self.pedidos_max = np.asarray(pedidos_max, dtype=np.int32)
+        self.dist_max = np.asarray(dist_max, dtype=float)
+
+        if asignacion is None:
+            asignacion = np.full(len(self.ix_pedidos), -1, dtype=np.int32)
+        self.set_asignacion(asignacion)
+
+    @classmethod
+    def from_ruteo(cls, ruteo):
+        """
+        Genera el estado compacto de la solución actual de un Ruteo.
+
+        Args:
+            ruteo (Ruteo): Instancia de Ruteo.
+
+        Returns:
+            EstadoRuteo: Estado compacto del ruteo.
+        """
+        pedidos = ruteo.get_pedidos()
+        camiones = ruteo.get_camiones()
+
+        estado = cls(ix_pedidos=[pedido.ix for pedido in pedidos],
+                     x=[pedido.x for pedido in pedidos],
+                     y=[pedido.y for pedido in pedidos],
+                     carga=[pedido.carga for pedido in pedidos],
+                     ix_camiones=[camion.ix for camion in camiones],
+                     carga_max=[camion.carga_max for camion in camiones],
+                     pedidos_max=[camion.pedidos_max for camion in camiones],
+                     dist_max=[camion.dist_max for camion in camiones])
+        estado.set_asignacion([ruteo.get_camion(pedido.camion_ix).pos if pedido.asignado else -1 for pedido in pedidos])
+
+        return estado
+
+    def __str__(self):
+        return f'EstadoRuteo\nPedidos {self.count_pedidos()}\nCamiones {self.count_camiones()}\nAsignados {int((self.asignacion >= 0).sum())}'
+
+    def __repr__(self):
+        return f'EstadoRuteo\nPedidos {self.count_pedidos()}\nCamiones {self.count_camiones()}\nAsignados {int((self.asignacion >= 0).sum())}'
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def copy(self):
+        """
+        Returns:
+            EstadoRuteo: Copia del estado que comparte los datos estáticos y copia la asignación.
+        """
+        nuevo = self.__class__.__new__(self.__class__)
+        nuevo.__dict__.update(self.__dict__)
+        nuevo.asignacion = self.asignacion.copy()
+        nuevo.carga_camiones = self.carga_camiones.copy()
+        nuevo.cantidad_camiones = self.cantidad_camiones.copy()
+        return nuevo
+
+    def count_pedidos(self):
+        """
+        Returns:
+            int: Cantidad de pedidos.
+        """
+        return len(self.ix_pedidos)
+
+    def count_camiones(self):
+        """
+        Returns:
+            int: Cantidad de camiones.
+        """
+        return len(self.ix_camiones)
+
+    def set_asignacion(self, asignacion):
+        """
+        Reemplaza la asignación y recalcula la carga y cantidad de pedidos de cada camión.
+
+        Args:
+            asignacion (list or np.ndarray): Posición del camión de cada pedido (-1 si no está asignado).
+        """
+        self.asignacion = np.array(asignacion, dtype=np.int32)
+        asignados = self.asignacion >= 0
+        n_camiones = self.count_camiones()
+
+        self.carga_camiones = np.round(np.bincount(self.asignacion[asignados], weights=self.carga[asignados], minlength=n_camiones), DECIMALES)
+        self.cantidad_camiones = np.bincount(self.asignacion[asignados], minlength=n_camiones).astype(np.int32)
+
+    def asignar(self, pos_pedido, pos_camion):
+        """
+        Asigna un pedido no asignado a un camión. No realiza los chequeos de las restricciones del camión.
+
+        Args:
+            pos_pedido (int): Posición del pedido.
+            pos_camion (int): Posición del camión.
+        """
+        if self.asignacion[pos_pedido] < 0:
+            self.asignacion[pos_pedido] = pos_camion
+            self.carga_camiones[pos_camion] = round(self.carga_camiones[pos_camion] + self.carga[pos_pedido], DECIMALES)
+            self.cantidad_camiones[pos_camion] += 1
+
+    def desasignar(self, pos_pedido):
+        """
+        Quita un pedido de su camión.
+
+        Args:
+            pos_pedido (int): Posición del pedido.
+        """
+        pos_camion = self.asignacion[pos_pedido]
+        if pos_camion >= 0:
+            self.asignacion[pos_pedido] = -1
+            self.carga_camiones[pos_camion] = round(self.carga_camiones[pos_camion] - self.carga[pos_pedido], DECIMALES)
+            self.cantidad_camiones[pos_camion] -= 1
+
+    def get_costo_camiones(self):
+        """
+        Returns:
+            np.ndarray: Costo de cada camión.
+        """
+        return costo_cargas(self.carga_camiones)
+
+    def get_carga_total(self):
+        """
+        Returns:
+            float: Carga total asignada.
+        """
+        return round(float(self.carga_camiones.sum()), DECIMALES)
+
+    def get_carga_no_asignada(self):
+        """
+        Returns:
+            float: Carga total de pedidos no asignados.
+        """
+        return round(float(self.carga[self.asignacion < 0].sum()), DECIMALES)
+
+    def get_costo_total_tn(self, costo_oportunidad):
+        """
+        Args:
+            costo_oportunidad (int or float): Costo de pedidos no asignados en $/tn.
+
+        Returns:
+            float: Costo total por tn de la solución.
+        """
+        costo_total = self.get_costo_camiones().sum() + self.get_carga_no_asignada()*costo_oportunidad
+        return round(float(costo_total/self.get_carga_total()), 2)
+
+    def nbytes(self):
+        """
+        Returns:
+            int: Memoria en bytes ocupada por los arrays de la solución (sin contar los datos estáticos).
+        """
+        return self.asignacion.nbytes + self.carga_camiones.nbytes + self.cantidad_camiones.nbytes
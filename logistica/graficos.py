@@ -0,0 +1,131 @@
+"""
+Visualizaciones del ruteo y de la optimización con plotly.
+
+Este módulo es opcional: el solver (Ruteo, Camion, Pedido, sa) no lo importa, y Ruteo.plot_solution() y
+metaheuristicas.make_history_plots() lo cargan recién al graficar.
+"""
+import plotly.express as px
+from plotly.subplots import make_subplots
+from .metaheuristicas import get_history_df
+
+
+def plot_solution(ruteo):
+    """
+    Grafica la ubicación de los pedidos coloreados según el camión al que están asignados.
+
+    Args:
+        ruteo (Ruteo): Instancia de Ruteo con una solución generada.
+    """
+    node_ix = []
+    node_x = []
+    node_y = []
+    node_carga = []
+    node_ix_camion = []
+
+    for pedido in ruteo.get_pedidos():
+        node_ix.append(pedido.ix)
+        node_x.append(pedido.x)
+        node_y.append(pedido.y)
+        node_carga.append(pedido.carga)
+        node_ix_camion.append(str(pedido.camion_ix) if pedido.asignado else "No Asignado")
+
+    cat_order = list(set(node_ix_camion))
+    cat_order.sort()
+
+    fig = px.scatter(x=node_x,
+                     y=node_y,
+                     size=node_carga,
+                     color=node_ix_camion,
+                     text=node_ix,
+                     category_orders={"color":cat_order},
+                     color_discrete_sequence=px.colors.qualitative.Prism,
+                     height=600,
+                     width=700,
+                     template="plotly_white")
+
+    # fig.update_traces(hovertemplate=
+    #               "<b>%{text}</b><br><br>" +
+    #               "GDP per Capita: %{x:$,.0f}<br>" +
+    #               "Life Expectation: %{y:.0%}<br>" +
+    #               "Population: %{marker.size:,}" +
+    #               "<extra></extra>")
+
+    fig.show()
+
+
+def make_history_plots(history):
+    """
+    Grafica la evolución de sa(): soluciones actual y nueva, delta y probabilidad de cambio, temperatura y mejor solución.
+
+    Args:
+        history (dict or pd.DataFrame): Historial devuelto por sa() o el DataFrame de get_history_df().
+    """
+    if isinstance(history, dict):
+        df_history = get_history_df(history)
+    else:
+        df_history = history
+    
+    # Sin registros por iteración (history_mode=None) sólo se grafica la sucesión de mejores soluciones.
+    if len(df_history) == 0:
+        if isinstance(history, dict):
+            fig = px.line(y=history["best_sol"],
+                          labels={"x":"Mejora", "y":"best_sol"},
+                          title="Mejor Solución",
+                          template="plotly_white",
+                          height=400,
+                          width=800)
+            fig.show()
+        return
+    
+    fig1 = px.line(df_history,
+                   x=df_history.index,
+                   y=["new_sol", "actual_sol"],
+                   color_discrete_map={"new_sol":"#4e68c7", "actual_sol":"#db8344"})
+
+    fig2 = px.line(df_history,
+                   x=df_history.index,
+                   y=["delta", "p"],
+                   color_discrete_map={"delta":"#4e68c7", "p":"#d43a22"})
+
+    fig3 = px.line(df_history,
+                   x=df_history.index,
+                   y=["temp"],
+                   color_discrete_map={"temp":"#4e68c7"})
+
+    fig4 = px.line(df_history,
+                   x=df_history.index,
+                   y=["best_sol"],
+                   color_discrete_map={"best_sol":"#22a7d4"})
+    
+    fig = make_subplots(rows=2, cols=2,
+                        column_widths=[0.5, 0.5],
+                        row_heights=[0.5, 0.5],
+                        subplot_titles=['Actual y Nueva Solución', 
+                                        'Temperatura', 
+                                        'Delta y Probabilidad de Cambio', 
+                                        'Mejor Solución'],
+                        shared_xaxes=True)
+
+    traces = []
+    for i, figure in enumerate([fig1, fig2, fig3, fig4]):
+        traces.append([])
+        for trace in range(len(figure["data"])):
+            traces[i].append(figure["data"][trace])
+
+    ubicacion = {0:[1,1], 1:[2,1], 2:[1,2], 3:[2,2]}
+
+    for i in range(4):
+        for trace in traces[i]:
+            fig.append_trace(trace, row=ubicacion[i][0], col=ubicacion[i][1])
+
+    fig.update_layout(template="plotly_white",
+                      height=800,
+                      width=1600,
+                      legend=dict(orientation="h",
+                                  yanchor="bottom",
+                                  y=1.08,
+                                  xanchor="center",
+                                  x=0.5),
+                      hovermode="x")
+
+    fig.show()
@@ -0,0 +1,217 @@
+import numpy as np
+
+
+class Historial(object):
+    """
+    La clase Historial registra la evolución de una metaheurística en buffers de NumPy preasignados:
+        - modo: Qué se registra.
+            - "full": Costo actual, costo nuevo y temperatura de cada iteración.
+            - "muestreo": Lo mismo que "full" pero sólo cada `cada` iteraciones.
+            - "temperatura": Agregados por temperatura: costo actual y nuevo promedio, mejor costo al final de la
+                             temperatura y tasa de aceptación.
+            - None: No se registra nada por iteración.
+        - cada: Intervalo de muestreo del modo "muestreo".
+
+    El método registrar() se resuelve al crear la instancia según el modo, para no evaluar el modo en cada iteración.
+    """
+
+    modos = ("full", "muestreo", "temperatura", None)
+
+    def __init__(self, n_temps, iters, modo="full", cada=100):
+        if modo not in self.modos:
+            raise ValueError(f"El modo de historial debe ser uno de {self.modos}")
+
+        self.modo = modo
+        self.cada = cada
+        self.iters = iters
+        self.iteracion = 0
+        self.cursor = 0
+
+        largo = self._largo(n_temps)
+
+        self.actual_sol = np.empty(largo)
+        self.new_sol = np.empty(largo)
+        self.temp = np.empty(largo)
+
+        if modo == "temperatura":
+            self.best_sol = np.empty(largo)
+            self.aceptacion = np.empty(largo)
+            self._reset_temperatura()
+
+        self.registrar = {"full": self._registrar_full,
+                          "muestreo": self._registrar_muestreo,
+                          "temperatura": self._registrar_temperatura,
+                          None: self._registrar_nada}[modo]
+
+    def _largo(self, n_temps):
+        """
+        Returns:
+            int: Cantidad de registros de n_temps temperaturas según el modo.
+        """
+        if self.modo == "full":
+            return n_temps*self.iters
+        elif self.modo == "muestreo":
+            return -(-n_temps*self.iters // self.cada)
+        elif self.modo == "temperatura":
+            return n_temps
+        return 0
+
+    def _buffers(self):
+        if self.modo == "temperatura":
+            return ("actual_sol", "new_sol", "temp", "best_sol", "aceptacion")
+        return ("actual_sol", "new_sol", "temp")
+
+    def reservar(self, n_temps):
+        """
+        Asegura lugar en los buffers para registrar n_temps temperaturas más, ampliándolos (al menos al doble) si hace falta.
+        Permite usar el historial cuando la cantidad de temperaturas no se conoce de antemano.
+
+        Args:
+            n_temps (int): Cantidad de temperaturas a registrar.
+        """
+        # Se suma un registro por el redondeo del muestreo entre temperaturas.
+        necesario = self.cursor + self._largo(n_temps) + (self.modo == "muestreo")
+        if self.modo is not None and necesario > len(self.actual_sol):
+            self._ampliar(max(necesario, 2*len(self.actual_sol)))
+
+    def _ampliar(self, largo):
+        for nombre in self._buffers():
+            buffer = np.empty(largo)
+            buffer[:self.cursor] = getattr(self, nombre)[:self.cursor]
+            setattr(self, nombre, buffer)
+
+    def _registrar_full(self, actual, nueva, temp, aceptada):
+        self.actual_sol[self.cursor] = actual
+        self.new_sol[self.cursor] = nueva
+        self.temp[self.cursor] = temp
+        self.cursor += 1
+        self.iteracion += 1
+
+    def _registrar_muestreo(self, actual, nueva, temp, aceptada):
+        if self.iteracion % self.cada == 0:
+            self.actual_sol[self.cursor] = actual
+            self.new_sol[self.cursor] = nueva
+            self.temp[self.cursor] = temp
+            self.cursor += 1
+        self.iteracion += 1
+
+    def _registrar_temperatura(self, actual, nueva, temp, aceptada):
+        self._suma_actual += actual
+        self._suma_nueva += nueva
+        self._aceptadas += aceptada
+        self._n += 1
+        self._temp = temp
+        self.iteracion += 1
+
+    def _registrar_nada(self, actual, nueva, temp, aceptada):
+        self.iteracion += 1
+
+    def _reset_temperatura(self):
+        self._suma_actual = 0.0
+        self._suma_nueva = 0.0
+        self._aceptadas = 0
+        self._n = 0
+        self._temp = 0.0
+
+    def fin_temperatura(self, best):
+        """
+        Cierra los agregados de la temperatura actual (sólo tiene efecto en el modo "temperatura").
+
+        Args:
+            best (float): Mejor costo encontrado al terminar la temperatura.
+        """
+        if self.modo == "temperatura" and self._n > 0:
+            self.actual_sol[self.cursor] = self._suma_actual/self._n
+            self.new_sol[self.cursor] = self._suma_nueva/self._n
+            self.temp[self.cursor] = self._temp
+            self.best_sol[self.cursor] = best
+            self.aceptacion[self.cursor] = self._aceptadas/self._n
+            self.cursor += 1
+            self._reset_temperatura()
+
+    def restaurar(self, registros, iteracion):
+        """
+        Carga en los buffers los registros de un historial anterior (por ejemplo de un checkpoint de sa()),
+        para continuar registrando a partir de ellos. Sólo debe usarse al terminar una temperatura.
+
+        Args:
+            registros (dict): Registros con las mismas claves que to_dict().
+            iteracion (int): Cantidad de iteraciones ya registradas.
+        """
+        if len(registros["actual_sol"]) > len(self.actual_sol):
+            self._ampliar(len(registros["actual_sol"]))
+
+        self.cursor = len(registros["actual_sol"])
+        self.iteracion = iteracion
+        self.actual_sol[:self.cursor] = registros["actual_sol"]
+        self.new_sol[:self.cursor] = registros["new_sol"]
+        self.temp[:self.cursor] = registros["temp"]
+
+        if self.modo == "temperatura":
+            self.best_sol[:self.cursor] = registros["best_sol_temp"]
+            self.aceptacion[:self.cursor] = registros["aceptacion"]
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Registros hasta el cursor actual, con las mismas claves que el historial de sa().
+        """
+        history = {"actual_sol": self.actual_sol[:self.cursor],
+                   "new_sol": self.new_sol[:self.cursor],
+                   "temp": self.temp[:self.cursor],
+                   "history_mode": self.modo,
+                   "history_step": self.cada if self.modo == "muestreo" else 1}
+
+        if self.modo == "temperatura":
+            history["best_sol_temp"] = self.best_sol[:self.cursor]
+            history["aceptacion"] = self.aceptacion[:self.cursor]
+
+        return history
+
+
+class Perfil(object):
+    """
+    La clase Perfil acumula la instrumentación opcional de una metaheurística:
+        - tiempos: Tiempo total en segundos de cada fase (ver fases).
+        - generados / aceptados: Cantidad de movimientos generados y aceptados de cada tipo de Movimiento.
+
+    Las fases de sa() son:
+        - "copia": Copia inicial de la solución.
+        - "generar": Generación de movimientos con Ruteo.generar_movimiento().
+        - "evaluar": Evaluación del costo de los movimientos sin aplicarlos.
+        - "aceptar": Criterio de aceptación.
+        - "aplicar": Aplicación de los movimientos aceptados.
+        - "registro": Registro del historial y de la mejor solución.
+        - "resultado": Restauración de la mejor solución al terminar.
+    """
+
+    fases = ("copia", "generar", "evaluar", "aceptar", "aplicar", "registro", "resultado")
+
+    def __init__(self):
+        self.tiempos = dict.fromkeys(self.fases, 0.0)
+        self.generados = {}
+        self.aceptados = {}
+
+    def movimiento(self, tipo, aceptado):
+        """
+        Args:
+            tipo (str): Tipo del movimiento generado.
+            aceptado (bool): Si el movimiento fue aceptado.
+        """
+        self.generados[tipo] = self.generados.get(tipo, 0) + 1
+        self.aceptados[tipo] = self.aceptados.get(tipo, 0) + aceptado
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Tiempos por fase y, para cada tipo de movimiento, cantidad generada, aceptada y tasa de aceptación.
+                  Los movimientos "nulo" son los que no modifican la solución.
+        """
+        movimientos = {tipo: {"generados": generados,
+                              "aceptados": self.aceptados[tipo],
+                              "aceptacion": self.aceptados[tipo]/generados}
+                       for tipo, generados in self.generados.items()}
+
+        return {"tiempos": dict(self.tiempos),
+                "movimientos": movimientos,
+                "nulos": self.generados.get("nulo", 0)}
@@ -1,17 +1,24 @@
 import pandas as pd
 import numpy as np
-from plotly.subplots import make_subplots
-import plotly.express as px
-from tqdm import tqdm
 import time
 import copy
 import math
 import random
+from concurrent.futures import ProcessPoolExecutor
+from .historial import Historial
+from .historial import Perfil
+from .checkpoint import guardar_checkpoint
+from .checkpoint import cargar_checkpoint
+from .componentes import Movimiento
+from .operadores import OPERADORES_DESTRUCCION
+from .operadores import OPERADORES_REPARACION
 
 
 
 
-def sa(ruteo_inicial, t_inicial, t_final, k, iters, temp_mode="linear", max_time=None, prob=1, random_state=None):
+def sa(ruteo_inicial, t_inicial, t_final, k, iters, temp_mode="linear", max_time=None, prob=1, random_state=None, progreso=True,
+       history_mode="full", history_step=100, batch=1, batch_mode="best", perfil=False, checkpoint=None, checkpoint_cada=1,
+       estancamiento=None, callback=None, _reanudar=None):
     """
     Esta función permite llevar a cabo la metaheurística de recocido simulado, definiendo número de iteraciones
     en cada temperatura y factor k de reducción de temperatura.
@@ -20,32 +27,73 @@ def sa(ruteo_inicial, t_inicial, t_final, k, iters, temp_mode="linear", max_time
         ruteo_inicial (Ruteo): Instancia de Ruteo con una solución incial generada.
         t_inicial (int or float): Temperatura inicial del proceso.
         t_final (int or float): Temperatura final del proceso.
-        k (int): Factor que define el número de temperaturas evaluadas en el intervalo definido.
+        k (int): Factor que define el número de temperaturas evaluadas en el intervalo definido. No se usa con temp_mode="tiempo".
         iters (int): Número de iteraciones para una temperatura.
+        temp_mode (str, optional): Esquema de enfriamiento:
+                                   - "linear": k temperaturas equiespaciadas entre t_inicial y t_final.
+                                   - "non_linear": k temperaturas según una curva logística desde t_inicial.
+                                   - "tiempo": La temperatura de cada bloque de iters iteraciones depende del tiempo transcurrido,
+                                     bajando geométricamente de t_inicial a t_final al llegar a max_time (ver sa_anytime()).
+                                   Defaults to "linear".
+        max_time (int or float, optional): Tiempo máximo de optimización en segundos. Se controla en cada iteración y al alcanzarlo
+                                           se devuelve la mejor solución encontrada. Obligatorio con temp_mode="tiempo". Defaults to None.
         prob (int, optional): Argumento opcional en la generación de vecinos. Defaults to 1.
         random_state (int, optional): Argumento opcional que permite elegir la semilla de generación de valores pseudoaleatorios. Defaults to 1.
+        progreso (bool, optional): Muestra la barra de progreso de temperaturas. Defaults to True.
+        history_mode (str, optional): Modo de registro del historial: "full", "muestreo" (cada history_step iteraciones),
+                                      "temperatura" (agregados por temperatura) o None. Defaults to "full".
+        history_step (int, optional): Intervalo de muestreo del modo "muestreo". Defaults to 100.
+        batch (int, optional): Cantidad de movimientos candidatos que se generan sobre la solución actual en cada iteración.
+                               Se evalúan todos juntos con Ruteo.evaluar_movimientos() y se aplica a lo sumo uno. Defaults to 1.
+        batch_mode (str, optional): Cómo se elige el movimiento del lote cuando batch > 1:
+                                    - "best": El de menor costo, que se acepta con el criterio de Metropolis.
+                                    - "metropolis": Se aplica el criterio de Metropolis a cada candidato en el orden en que fueron
+                                      generados y se aplica el primero aceptado.
+                                    Defaults to "best".
+        perfil (bool, optional): Registra el tiempo de cada fase del proceso y la cantidad y tasa de aceptación de cada tipo
+                                 de movimiento (ver Perfil). Se devuelve en la clave "perfil" del historial. Defaults to False.
+        checkpoint (str or Path, optional): Archivo npz en el que se guarda periódicamente el estado del proceso (asignación actual y
+                                            mejor, índice de temperatura, estado del generador aleatorio e historial) para poder
+                                            continuarlo con sa_resume(). Defaults to None (no se guarda).
+        checkpoint_cada (int, optional): Cantidad de temperaturas entre checkpoints. Defaults to 1.
+        estancamiento (int, optional): Termina el proceso si la mejor solución no mejora durante esta cantidad de iteraciones.
+                                       Defaults to None (no se controla).
+        callback (callable, optional): Función que se llama al terminar cada temperatura con un diccionario con el índice
+                                       de la temperatura (temperatura), la temperatura (temp), las iteraciones realizadas (iters),
+                                       el costo actual (actual_sol), el mejor costo (best_sol) y el tiempo transcurrido (time).
+                                       Defaults to None.
 
     Returns:
         tuple: Devuelve dos objetos:
                - La instancia de Ruteo con la mejor solución encontrada.
                - Un diccionario que contiene la sucesión de soluciones evaluadas y la sucesión de mejores soluciones. Además guarda el tiempo de ejecución.
     """
-    # Definimos la semilla de números aleatorios.
-    if random_state is not None:
+    if batch_mode not in ("best", "metropolis"):
+        raise ValueError('batch_mode debe ser "best" o "metropolis"')
+    if temp_mode == "tiempo" and (max_time is None or t_final <= 0):
+        raise ValueError('temp_mode="tiempo" requiere max_time y t_final mayor a 0')
+    
+    # Definimos la semilla de números aleatorios. Al reanudar, el generador ya quedó en el estado del checkpoint.
+    if random_state is not None and _reanudar is None:
         random.seed(random_state)
-    # Medidos el tiempo de comienzo.
-    start = time.time()
+    # Medidos el tiempo de comienzo (al reanudar se descuenta el tiempo ya transcurrido).
+    start = time.time() - (_reanudar["time"] if _reanudar else 0)
+    deadline = start + max_time if max_time is not None else math.inf
     
-    # Copiamos la solución actual y mejor en nuevos objetos.
-    best_solution = copy.deepcopy(ruteo_inicial)
+    # Con perfil=False no se toma ningún tiempo dentro del loop.
+    perfil = Perfil() if perfil else None
+    reloj = time.perf_counter
+    if perfil:
+        t0 = reloj()
+    
+    # Copiamos la solución inicial en la única instancia que se modifica durante el proceso.
+    # De la mejor solución sólo guardamos su estado compacto (arrays de asignación).
     actual_solution = copy.deepcopy(ruteo_inicial)
+    best_estado = actual_solution.get_estado()
+    best_costo = actual_solution.costo_total_tn
     
-    # Generamos el diccionario que contiene toda la información del proceso.
-    solution_history = {}
-    solution_history["actual_sol"] = []
-    solution_history["new_sol"] = []
-    solution_history["best_sol"] = [best_solution.costo_total_tn]
-    solution_history["temp"] = []
+    if perfil:
+        perfil.tiempos["copia"] += reloj() - t0
     
     # Generamos una lista decreciente de temperaturas según los parámetros de la función.
     #temps = list(-np.sort(-np.arange(t_final, t_inicial+k, k)))
@@ -54,67 +102,734 @@ def sa(ruteo_inicial, t_inicial, t_final, k, iters, temp_mode="linear", max_time
         
     elif temp_mode == "non_linear":
         temps = non_linear_temps(t_inicial, k)
+    
+    elif temp_mode == "tiempo":
+        # La cantidad de temperaturas depende del tiempo, por lo que el historial se amplía a medida que se necesita.
+        temps = []
         
     else:
         temps = linear_temps(t_inicial, t_final, k)
     
+    # Generamos el diccionario que contiene toda la información del proceso.
+    # Las soluciones evaluadas se registran en buffers preasignados según el modo de historial.
+    solution_history = {}
+    solution_history["best_sol"] = [best_costo]
+    historial = Historial(len(temps), iters, modo=history_mode, cada=history_step)
+    inicio = 0
+    
+    # Al reanudar partimos del estado guardado en el checkpoint.
+    if _reanudar:
+        actual_solution.set_estado(_estado_desde_asignacion(actual_solution, _reanudar["asignacion"]))
+        best_estado = _estado_desde_asignacion(actual_solution, _reanudar["best_asignacion"])
+        best_costo = _reanudar["best_costo"]
+        solution_history["best_sol"] = _reanudar["best_sol"]
+        historial.restaurar(_reanudar["historial"], _reanudar["iteracion"])
+        inicio = _reanudar["temp"]
+    
+    if checkpoint is not None:
+        params = dict(t_inicial=t_inicial, t_final=t_final, k=k, iters=iters, temp_mode=temp_mode, max_time=max_time, prob=prob,
+                      random_state=random_state, history_mode=history_mode, history_step=history_step, batch=batch,
+                      batch_mode=batch_mode, checkpoint_cada=checkpoint_cada, estancamiento=estancamiento)
+    
+    if temp_mode == "tiempo":
+        temperaturas = time_temps(t_inicial, t_final, start, max_time, inicio)
+    else:
+        temperaturas = zip(range(inicio, len(temps)), temps[inicio:])
+    
+    # Motivo por el que termina el proceso y última iteración en que mejoró la mejor solución.
+    motivo_fin = "temperaturas"
+    ultima_mejora = historial.iteracion
+    
     # Para cada temperatura:
-    for t in tqdm(temps):           
+    for ix_temp, t in (_barra_progreso(temperaturas, total=len(temps) or None, initial=inicio) if progreso else temperaturas):
+        historial.reservar(1)
         # Para el número de iteraciones por temperatura elegidas.
         for i in range(iters):
-            # Copiamos la solución actual y generamos un vecino.
-            new_solution = copy.deepcopy(actual_solution)
-            new_solution.get_vecino(prob=prob)
+            # Al alcanzar el tiempo máximo se corta el proceso sin terminar la temperatura.
+            if time.time() > deadline:
+                motivo_fin = "tiempo"
+                break
             
-            solution_history["actual_sol"].append(actual_solution.costo_total_tn)
-            solution_history["new_sol"].append(new_solution.costo_total_tn)
-            solution_history["temp"].append(t)
+            actual_costo = actual_solution.costo_total_tn
             
-            # Calculamos la diferencia de costos.
-            delta =  actual_solution.costo_total_tn - new_solution.costo_total_tn
-            #print(f"Temp={t}, New_Sol={new_solution.costo_total_tn}, Actual_Sol={actual_solution.costo_total_tn}, Delta={delta}, Prob={math.exp(delta/t)}")
+            if batch > 1:
+                # Generamos un lote de movimientos sobre la solución actual y elegimos uno según batch_mode.
+                movimiento, new_costo, aceptada = _elegir_movimiento(actual_solution, batch, batch_mode, t, prob, perfil)
+                if perfil:
+                    t0 = reloj()
+            else:
+                if perfil:
+                    t0 = reloj()
+                # Generamos un movimiento sobre la solución actual y evaluamos su costo sin aplicarlo.
+                movimiento = actual_solution.generar_movimiento(prob=prob)
+                if perfil:
+                    t1 = reloj()
+                    perfil.tiempos["generar"] += t1 - t0
+                new_costo = actual_solution.evaluar_costo_total_tn(movimiento)
+                if perfil:
+                    t0 = reloj()
+                    perfil.tiempos["evaluar"] += t0 - t1
+                
+                # Calculamos la diferencia de costos.
+                delta =  actual_costo - new_costo
+                
+                # Si la nueva solución no es peor o la probabilidad es mayor a una uniforme 0-1 aplicamos el movimiento.
+                u = random.uniform(0,1)
+                aceptada = delta >= 0 or math.exp(delta/t) > u
+                if perfil:
+                    t1 = reloj()
+                    perfil.tiempos["aceptar"] += t1 - t0
+                    perfil.movimiento(movimiento.tipo, aceptada)
+                    t0 = t1
             
-            # Si la probabilidad es mayor a una uniforme 0-1
-            if math.exp(delta/t) > random.uniform(0,1):
-                # La solución actual pasa a ser la nueva solución con mayor costo.
-                actual_solution = copy.deepcopy(new_solution)
+            if aceptada:
+                actual_solution.aplicar_movimiento(movimiento)
+                if perfil:
+                    t1 = reloj()
+                    perfil.tiempos["aplicar"] += t1 - t0
+                    t0 = t1
+            
+            historial.registrar(actual_costo, new_costo, t, aceptada)
             
             # Si la solución actual guardada tiene un menor costo que la mejor solución encontrada.
-            if actual_solution.costo_total_tn < best_solution.costo_total_tn:
+            if actual_solution.costo_total_tn < best_costo:
                 # Actualizamos la mejor solución encontrada.
-                best_solution = copy.deepcopy(actual_solution)
-                solution_history["best_sol"].append(best_solution.costo_total_tn)
-        
-        if max_time is not None:
-            if max_time < (time.time() - start):
+                best_estado = actual_solution.get_estado()
+                best_costo = actual_solution.costo_total_tn
+                solution_history["best_sol"].append(best_costo)
+                ultima_mejora = historial.iteracion
+            
+            if perfil:
+                perfil.tiempos["registro"] += reloj() - t0
+            
+            if estancamiento is not None and historial.iteracion - ultima_mejora >= estancamiento:
+                motivo_fin = "estancamiento"
                 break
+        
+        historial.fin_temperatura(best_costo)
+        
+        if callback is not None:
+            callback({"temperatura": ix_temp, "temp": t, "iters": historial.iteracion, "actual_sol": actual_solution.costo_total_tn,
+                      "best_sol": best_costo, "time": time.time() - start})
+        
+        fin = motivo_fin != "temperaturas" or time.time() > deadline
+        if fin and motivo_fin == "temperaturas":
+            motivo_fin = "tiempo"
+        
+        if checkpoint is not None and (fin or (ix_temp + 1) % checkpoint_cada == 0 or ix_temp == len(temps) - 1):
+            _guardar_checkpoint_sa(checkpoint, params, ix_temp + 1, actual_solution, best_estado, best_costo,
+                                   solution_history, historial, time.time() - start)
+        
+        if fin:
+            break
+    
+    # Dejamos en la instancia la mejor asignación encontrada.
+    if perfil:
+        t0 = reloj()
+    best_solution = actual_solution
+    best_solution.set_estado(best_estado)
+    if perfil:
+        perfil.tiempos["resultado"] += reloj() - t0
             
     # Terminamos de medir el tiempo de ejecución y guardamos los resultados.
     end = time.time()
     solution_history["time"] = end-start
     solution_history["random_state"] = random_state
-    solution_history["iters"] = len(solution_history["actual_sol"])
+    solution_history["iters"] = historial.iteracion
+    solution_history["movimientos_evaluados"] = historial.iteracion*batch
+    solution_history["motivo_fin"] = motivo_fin
+    solution_history.update(historial.to_dict())
+    if perfil:
+        solution_history["perfil"] = perfil.to_dict()
     
     return (best_solution, solution_history)
 
 
+def sa_anytime(ruteo_inicial, max_time, t_inicial, t_final, iters=100, estancamiento=None, prob=1, random_state=None, progreso=False,
+               history_mode="temperatura", history_step=100, batch=1, batch_mode="best", perfil=False):
+    """
+    Recocido simulado con presupuesto de tiempo: el enfriamiento depende del tiempo transcurrido en lugar de un número fijo
+    de temperaturas, de modo que el proceso recorre todo el rango de temperaturas en max_time segundos sin importar el tamaño
+    de la instancia. Al llegar a max_time (o antes, si la mejor solución no mejora durante estancamiento iteraciones) se
+    devuelve la mejor solución encontrada hasta el momento.
+
+    Args:
+        ruteo_inicial (Ruteo): Instancia de Ruteo con una solución incial generada.
+        max_time (int or float): Tiempo máximo de optimización en segundos.
+        t_inicial (int or float): Temperatura inicial del proceso.
+        t_final (int or float): Temperatura final del proceso, mayor a 0.
+        iters (int, optional): Iteraciones entre actualizaciones de la temperatura. Defaults to 100.
+        estancamiento (int, optional): Iteraciones sin mejorar la mejor solución tras las que se termina. Defaults to None.
+        prob, random_state, progreso, history_mode, history_step, batch, batch_mode, perfil: Ver sa(). Por defecto se
+            registra el historial agregado por temperatura, ya que la cantidad de iteraciones no se conoce de antemano.
+
+    Returns:
+        tuple: Mismo resultado que sa(). En el historial, motivo_fin indica si el proceso terminó por "tiempo" o "estancamiento".
+    """
+    return sa(ruteo_inicial, t_inicial, t_final, k=None, iters=iters, temp_mode="tiempo", max_time=max_time, prob=prob,
+              random_state=random_state, progreso=progreso, history_mode=history_mode, history_step=history_step, batch=batch,
+              batch_mode=batch_mode, perfil=perfil, estancamiento=estancamiento)
+
+
+def sa_resume(ruteo_inicial, checkpoint, max_time=None, progreso=True, perfil=False):
+    """
+    Continúa un proceso de sa() desde su último checkpoint, con los mismos parámetros y el mismo estado del generador
+    aleatorio, de modo que el resultado es el mismo que si el proceso no se hubiera interrumpido.
+    El proceso reanudado sigue actualizando el mismo checkpoint.
+
+    Args:
+        ruteo_inicial (Ruteo): Instancia de Ruteo con los mismos camiones y pedidos que la del proceso original.
+        checkpoint (str or Path): Archivo npz guardado por sa().
+        max_time (int or float, optional): Tiempo máximo total de optimización, incluyendo el tiempo ya transcurrido.
+                                           Defaults to None (el de la corrida original).
+        progreso (bool, optional): Muestra la barra de progreso de temperaturas. Defaults to True.
+        perfil (bool, optional): Ver sa(). El perfil sólo incluye la parte reanudada. Defaults to False.
+
+    Returns:
+        tuple: Mismo resultado que sa().
+    """
+    params, arrays, valores = cargar_checkpoint(checkpoint)
+    
+    if max_time is not None:
+        params["max_time"] = max_time
+    
+    historial = {clave[len("historial_"):]: valor for clave, valor in arrays.items() if clave.startswith("historial_")}
+    reanudar = dict(valores, asignacion=arrays["asignacion"], best_asignacion=arrays["best_asignacion"],
+                    best_sol=arrays["best_sol"].tolist(), historial=historial)
+    
+    return sa(ruteo_inicial, progreso=progreso, perfil=perfil, checkpoint=checkpoint, _reanudar=reanudar, **params)
+
+
+def _estado_desde_asignacion(ruteo, asignacion):
+    estado = ruteo.get_estado()
+    estado.set_asignacion(asignacion)
+    return estado
+
+
+def _guardar_checkpoint_sa(path, params, temp, actual_solution, best_estado, best_costo, solution_history, historial, tiempo):
+    """
+    Guarda el checkpoint de sa(). Sólo se guardan las asignaciones (un entero por pedido), los registros del historial
+    hasta el cursor y algunos valores escalares.
+    """
+    registros = historial.to_dict()
+    arrays = {"asignacion": actual_solution.estado.asignacion,
+              "best_asignacion": best_estado.asignacion,
+              "best_sol": np.array(solution_history["best_sol"])}
+    arrays.update({f"historial_{clave}": valor for clave, valor in registros.items() if isinstance(valor, np.ndarray)})
+    
+    valores = {"temp": temp, "best_costo": best_costo, "iteracion": historial.iteracion, "time": tiempo}
+    
+    guardar_checkpoint(path, params, arrays, valores)
+
+
+def _elegir_movimiento(ruteo, batch, batch_mode, t, prob, perfil=None):
+    """
+    Genera batch movimientos candidatos sobre la solución actual de ruteo, los evalúa en una única pasada vectorizada
+    y elige uno de ellos según batch_mode (ver sa()). Si se pasa un Perfil se registran los tiempos de cada fase y
+    todos los movimientos generados, de los cuales sólo el elegido puede figurar como aceptado.
+
+    Returns:
+        tuple: Movimiento elegido, su costo total por tn y si fue aceptado.
+    """
+    if perfil:
+        t0 = time.perf_counter()
+    actual_costo = ruteo.costo_total_tn
+    movimientos = [ruteo.generar_movimiento(prob=prob) for _ in range(batch)]
+    if perfil:
+        t1 = time.perf_counter()
+        perfil.tiempos["generar"] += t1 - t0
+    new_costos = ruteo.evaluar_movimientos(movimientos)
+    deltas = actual_costo - new_costos
+    if perfil:
+        t0 = time.perf_counter()
+        perfil.tiempos["evaluar"] += t0 - t1
+    
+    if batch_mode == "best":
+        elegido = int(np.argmin(new_costos))
+        u = random.uniform(0,1)
+        aceptada = bool(deltas[elegido] >= 0 or math.exp(deltas[elegido]/t) > u)
+    else:
+        # Criterio de Metropolis sobre cada candidato: el primero aceptado es el que se aplica.
+        u = np.array([random.uniform(0,1) for _ in range(batch)])
+        with np.errstate(over="ignore"):
+            aceptados = np.flatnonzero((deltas >= 0) | (np.exp(np.minimum(deltas, 0)/t) > u))
+        
+        # Si ningún candidato es aceptado se registra el último evaluado.
+        aceptada = len(aceptados) > 0
+        elegido = int(aceptados[0]) if aceptada else batch - 1
+    
+    if perfil:
+        perfil.tiempos["aceptar"] += time.perf_counter() - t0
+        for ix, movimiento in enumerate(movimientos):
+            perfil.movimiento(movimiento.tipo, aceptada and ix == elegido)
+    
+    return (movimientos[elegido], float(new_costos[elegido]), aceptada)
+
+
+def sa_multistart(ruteo_inicial, n_chains, t_inicial, t_final, k, iters, temp_mode="linear", max_time=None, prob=1, random_state=None, sol_inicial_mode=None, max_workers=None,
+                  history_mode="full", history_step=100, batch=1, batch_mode="best"):
+    """
+    Ejecuta n_chains cadenas independientes de recocido simulado en paralelo (una por proceso) y devuelve la mejor.
+    Cada cadena usa su propia semilla, derivada de random_state, y opcionalmente su propio modo de solución inicial.
+
+    Args:
+        ruteo_inicial (Ruteo): Instancia de Ruteo. Si sol_inicial_mode es None debe tener una solución inicial generada.
+        n_chains (int): Número de cadenas independientes.
+        t_inicial, t_final, k, iters, temp_mode, max_time, prob, history_mode, history_step, batch, batch_mode: Argumentos de sa()
+            para cada cadena.
+        random_state (int, optional): Semilla a partir de la cual se generan las semillas de cada cadena. Defaults to None.
+        sol_inicial_mode (str or list, optional): Modo de get_solucion_inicial() de cada cadena. Si es una lista se usa
+                                                  un modo por cadena en forma cíclica. Si es None todas las cadenas parten
+                                                  de la solución de ruteo_inicial. Defaults to None.
+        max_workers (int, optional): Número de procesos. Con 1 las cadenas corren en el proceso actual. Defaults to None (núcleos disponibles).
+
+    Returns:
+        tuple: Devuelve dos objetos:
+               - La instancia de Ruteo con la mejor solución encontrada entre todas las cadenas.
+               - Un diccionario con el historial de cada cadena (chains), la cadena ganadora (best_chain),
+                 el tiempo de cada cadena (chain_time), las semillas usadas (random_state) y el tiempo total (time).
+    """
+    start = time.time()
+    
+    # Semillas independientes y reproducibles para cada cadena.
+    seeds = np.random.SeedSequence(None if random_state is None else int(random_state)).generate_state(n_chains).tolist()
+    
+    if sol_inicial_mode is None or isinstance(sol_inicial_mode, str):
+        modes = [sol_inicial_mode]*n_chains
+    else:
+        modes = [sol_inicial_mode[i % len(sol_inicial_mode)] for i in range(n_chains)]
+    
+    params = dict(t_inicial=t_inicial, t_final=t_final, k=k, iters=iters, temp_mode=temp_mode, max_time=max_time, prob=prob,
+                  history_mode=history_mode, history_step=history_step, batch=batch, batch_mode=batch_mode)
+    args = [(ruteo_inicial, modes[i], seeds[i], params) for i in range(n_chains)]
+    
+    if max_workers == 1:
+        results = [_sa_chain(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_sa_chain, *zip(*args)))
+    
+    # Elegimos la cadena con menor costo total por tn.
+    costos = [costo for _, costo, _ in results]
+    best_chain = int(np.argmin(costos))
+    
+    best_solution = copy.deepcopy(ruteo_inicial)
+    best_solution.set_estado(results[best_chain][0])
+    
+    solution_history = {}
+    solution_history["chains"] = [history for _, _, history in results]
+    solution_history["best_chain"] = best_chain
+    solution_history["best_sol"] = costos
+    solution_history["chain_time"] = [history["time"] for _, _, history in results]
+    solution_history["chain_mode"] = modes
+    solution_history["random_state"] = seeds
+    solution_history["iters"] = sum(history["iters"] for _, _, history in results)
+    solution_history["time"] = time.time() - start
+    
+    return (best_solution, solution_history)
+
+
+def _sa_chain(ruteo_inicial, mode, seed, params):
+    """
+    Ejecuta una cadena de sa_multistart(). Devuelve sólo el estado compacto de la mejor solución para
+    no tener que enviar el Ruteo completo de vuelta al proceso principal.
+    """
+    if mode is not None:
+        ruteo_inicial = copy.deepcopy(ruteo_inicial)
+        ruteo_inicial.get_solucion_inicial(mode=mode, random_state=seed)
+    
+    best_solution, history = sa(ruteo_inicial, random_state=seed, progreso=False, **params)
+    
+    return (best_solution.get_estado(), best_solution.costo_total_tn, history)
+
+
+def tabu(ruteo_inicial, iters, tenure=10, vecindario=20, max_time=None, random_state=None, progreso=True, history_mode="full",
+         history_step=100, estancamiento=None, callback=None):
+    """
+    Esta función permite llevar a cabo la metaheurística de búsqueda tabú. En cada iteración se eligen al azar vecindario
+    pedidos, se generan todos sus movimientos válidos con Ruteo.generar_movimientos_pedido(), se evalúan juntos con
+    Ruteo.evaluar_movimientos() y se aplica el de menor costo que no sea tabú, aunque empeore la solución actual.
+    
+    Al aplicar un movimiento, cada pedido movido no puede volver a su camión de origen (o quedar sin asignar, si no
+    estaba asignado) durante tenure iteraciones. Un movimiento tabú se admite igual si mejora la mejor solución encontrada
+    (criterio de aspiración).
+
+    Args:
+        ruteo_inicial (Ruteo): Instancia de Ruteo con una solución incial generada.
+        iters (int): Número de iteraciones.
+        tenure (int, optional): Cantidad de iteraciones que un par (pedido, camión) permanece tabú. Defaults to 10.
+        vecindario (int, optional): Cantidad de pedidos cuyos movimientos se evalúan en cada iteración. Defaults to 20.
+        max_time (int or float, optional): Tiempo máximo de optimización en segundos. Se controla en cada iteración. Defaults to None.
+        random_state (int, optional): Semilla de generación de valores pseudoaleatorios. Defaults to None.
+        progreso (bool, optional): Muestra la barra de progreso de bloques de history_step iteraciones. Defaults to True.
+        history_mode (str, optional): Modo de registro del historial (ver sa()). Como no hay temperaturas, el modo "temperatura"
+                                      agrega bloques de history_step iteraciones y la temperatura registrada es NaN. Defaults to "full".
+        history_step (int, optional): Intervalo de muestreo del modo "muestreo" y tamaño de los bloques. Defaults to 100.
+        estancamiento (int, optional): Termina el proceso si la mejor solución no mejora durante esta cantidad de iteraciones.
+                                       Defaults to None (no se controla).
+        callback (callable, optional): Función que se llama al terminar cada bloque con un diccionario con el índice del bloque
+                                       (bloque), las iteraciones realizadas (iters), el costo actual (actual_sol), el mejor costo
+                                       (best_sol) y el tiempo transcurrido (time). Defaults to None.
+
+    Returns:
+        tuple: Mismo resultado que sa(). En el historial, motivo_fin indica si el proceso terminó por "iteraciones", "tiempo"
+               o "estancamiento".
+    """
+    if random_state is not None:
+        random.seed(random_state)
+    start = time.time()
+    deadline = start + max_time if max_time is not None else math.inf
+    
+    actual_solution = copy.deepcopy(ruteo_inicial)
+    best_estado = actual_solution.get_estado()
+    best_costo = actual_solution.costo_total_tn
+    ix_pedidos = actual_solution.estado.ix_pedidos
+    vecindario = min(vecindario, len(ix_pedidos))
+    
+    # Iteración hasta la que cada par (ix_pedido, ix_camion) es tabú. None como camión representa quedar sin asignar.
+    tabues = {}
+    
+    n_bloques = -(-iters // history_step)
+    bloques = [(ix_bloque, min(history_step, iters - ix_bloque*history_step)) for ix_bloque in range(n_bloques)]
+    
+    solution_history = {}
+    solution_history["best_sol"] = [best_costo]
+    historial = Historial(n_bloques, history_step, modo=history_mode, cada=history_step)
+    movimientos_evaluados = 0
+    motivo_fin = "iteraciones"
+    ultima_mejora = 0
+    
+    for ix_bloque, iters_bloque in (_barra_progreso(bloques) if progreso else bloques):
+        for i in range(iters_bloque):
+            if time.time() > deadline:
+                motivo_fin = "tiempo"
+                break
+            
+            iteracion = historial.iteracion
+            actual_costo = actual_solution.costo_total_tn
+            
+            movimientos = []
+            for ix_pedido in random.sample(ix_pedidos, vecindario):
+                movimientos += actual_solution.generar_movimientos_pedido(ix_pedido)
+            
+            new_costo = actual_costo
+            aceptada = len(movimientos) > 0
+            if aceptada:
+                costos = actual_solution.evaluar_movimientos(movimientos)
+                movimientos_evaluados += len(movimientos)
+                
+                # Los movimientos tabú sólo son admisibles si mejoran la mejor solución (aspiración).
+                admisibles = np.array([all(tabues.get((ix_pedido, destino), -1) < iteracion for ix_pedido, _, destino in movimiento.cambios)
+                                       for movimiento in movimientos])
+                admisibles |= costos < best_costo
+                aceptada = bool(admisibles.any())
+            
+            if aceptada:
+                elegido = int(np.flatnonzero(admisibles)[np.argmin(costos[admisibles])])
+                movimiento = movimientos[elegido]
+                new_costo = float(costos[elegido])
+                actual_solution.aplicar_movimiento(movimiento)
+                for ix_pedido, origen, _ in movimiento.cambios:
+                    tabues[(ix_pedido, origen)] = iteracion + tenure
+            
+            historial.registrar(actual_costo, new_costo, np.nan, aceptada)
+            
+            if actual_solution.costo_total_tn < best_costo:
+                best_estado = actual_solution.get_estado()
+                best_costo = actual_solution.costo_total_tn
+                solution_history["best_sol"].append(best_costo)
+                ultima_mejora = historial.iteracion
+            
+            if estancamiento is not None and historial.iteracion - ultima_mejora >= estancamiento:
+                motivo_fin = "estancamiento"
+                break
+        
+        historial.fin_temperatura(best_costo)
+        
+        if callback is not None:
+            callback({"bloque": ix_bloque, "iters": historial.iteracion, "actual_sol": actual_solution.costo_total_tn,
+                      "best_sol": best_costo, "time": time.time() - start})
+        
+        if motivo_fin != "iteraciones":
+            break
+    
+    # Dejamos en la instancia la mejor asignación encontrada.
+    best_solution = actual_solution
+    best_solution.set_estado(best_estado)
+    
+    solution_history["time"] = time.time() - start
+    solution_history["random_state"] = random_state
+    solution_history["iters"] = historial.iteracion
+    solution_history["movimientos_evaluados"] = movimientos_evaluados
+    solution_history["motivo_fin"] = motivo_fin
+    solution_history.update(historial.to_dict())
+    
+    return (best_solution, solution_history)
+
+
+def alns(ruteo_inicial, iters, t_inicial=50, t_final=1, destruccion=None, reparacion=None, n_destruir=(2, 10), segmento=100,
+         reaccion=0.2, puntajes=(33, 9, 13), max_time=None, random_state=None, progreso=True, history_mode="full", history_step=100,
+         estancamiento=None, callback=None):
+    """
+    Esta función permite llevar a cabo la metaheurística de búsqueda adaptativa en vecindarios grandes (ALNS).
+    En cada iteración se elige un operador de destrucción, que quita varios pedidos de la solución actual, y uno de
+    reparación, que intenta insertar los pedidos quitados y los no asignados cercanos a ellos (ver logistica.operadores). La nueva solución se acepta
+    con el criterio de Metropolis, con una temperatura que baja geométricamente de t_inicial a t_final.
+    
+    Los operadores se eligen por ruleta según sus pesos. Cada vez que se usan suman puntaje si la nueva solución es la mejor
+    encontrada, si mejora la actual o si es aceptada aunque sea peor. Al terminar cada segmento el peso de cada operador
+    se actualiza con su puntaje promedio: peso = (1 - reaccion)*peso + reaccion*puntaje/usos.
+
+    Args:
+        ruteo_inicial (Ruteo): Instancia de Ruteo con una solución incial generada.
+        iters (int): Número de iteraciones.
+        t_inicial (int or float, optional): Temperatura inicial del criterio de aceptación. Defaults to 50.
+        t_final (int or float, optional): Temperatura final, mayor a 0. Defaults to 1.
+        destruccion (list or dict, optional): Nombres de OPERADORES_DESTRUCCION o diccionario de operadores propios por nombre.
+                                              Defaults to None (todos los de OPERADORES_DESTRUCCION).
+        reparacion (list or dict, optional): Ídem para los operadores de reparación. Defaults to None (todos los de OPERADORES_REPARACION).
+        n_destruir (tuple, optional): Cantidad mínima y máxima de pedidos a quitar en cada iteración. Defaults to (2, 10).
+        segmento (int, optional): Iteraciones entre actualizaciones de los pesos. Defaults to 100.
+        reaccion (float, optional): Velocidad de adaptación de los pesos, entre 0 y 1. Defaults to 0.2.
+        puntajes (tuple, optional): Puntaje por nueva mejor solución, por mejorar la actual y por aceptar una peor. Defaults to (33, 9, 13).
+        max_time (int or float, optional): Tiempo máximo de optimización en segundos. Se controla en cada iteración. Defaults to None.
+        random_state (int, optional): Semilla de generación de valores pseudoaleatorios. Defaults to None.
+        progreso (bool, optional): Muestra la barra de progreso de segmentos. Defaults to True.
+        history_mode (str, optional): Modo de registro del historial (ver sa()). El modo "temperatura" agrega por segmento. Defaults to "full".
+        history_step (int, optional): Intervalo de muestreo del modo "muestreo". Defaults to 100.
+        estancamiento (int, optional): Termina el proceso si la mejor solución no mejora durante esta cantidad de iteraciones.
+                                       Defaults to None (no se controla).
+        callback (callable, optional): Función que se llama al terminar cada segmento con un diccionario con el índice del
+                                       segmento (segmento), la temperatura (temp), las iteraciones realizadas (iters), el costo
+                                       actual (actual_sol), el mejor costo (best_sol), los pesos (pesos) y el tiempo transcurrido (time).
+                                       Defaults to None.
+
+    Returns:
+        tuple: Mismo resultado que sa(). El historial además incluye los pesos finales (pesos) y, para cada operador,
+               la cantidad de usos y de nuevas mejores soluciones (operadores).
+    """
+    if t_final <= 0:
+        raise ValueError("t_final debe ser mayor a 0")
+    
+    destruccion = _operadores(destruccion, OPERADORES_DESTRUCCION)
+    reparacion = _operadores(reparacion, OPERADORES_REPARACION)
+    
+    if random_state is not None:
+        random.seed(random_state)
+    start = time.time()
+    deadline = start + max_time if max_time is not None else math.inf
+    
+    actual_solution = copy.deepcopy(ruteo_inicial)
+    best_estado = actual_solution.get_estado()
+    best_costo = actual_solution.costo_total_tn
+    ix_pedidos = actual_solution.estado.ix_pedidos
+    ix_camiones = actual_solution.estado.ix_camiones
+    
+    # Pesos, puntaje del segmento y estadísticas de cada operador, identificados por (tipo, nombre).
+    operadores = [("destruccion", nombre) for nombre in destruccion] + [("reparacion", nombre) for nombre in reparacion]
+    pesos = dict.fromkeys(operadores, 1.0)
+    puntaje = dict.fromkeys(operadores, 0.0)
+    usos_segmento = dict.fromkeys(operadores, 0)
+    usos = dict.fromkeys(operadores, 0)
+    mejoras = dict.fromkeys(operadores, 0)
+    
+    n_segmentos = -(-iters // segmento)
+    segmentos = [(ix_segmento, min(segmento, iters - ix_segmento*segmento)) for ix_segmento in range(n_segmentos)]
+    
+    solution_history = {}
+    solution_history["best_sol"] = [best_costo]
+    historial = Historial(n_segmentos, segmento, modo=history_mode, cada=history_step)
+    motivo_fin = "iteraciones"
+    ultima_mejora = 0
+    t = t_inicial
+    
+    for ix_segmento, iters_segmento in (_barra_progreso(segmentos) if progreso else segmentos):
+        for i in range(iters_segmento):
+            if time.time() > deadline:
+                motivo_fin = "tiempo"
+                break
+            
+            t = t_inicial*(t_final/t_inicial)**(historial.iteracion/iters)
+            actual_costo = actual_solution.costo_total_tn
+            asignacion_previa = actual_solution.estado.asignacion.copy()
+            
+            nombre_destruccion = random.choices(list(destruccion), weights=[pesos[("destruccion", nombre)] for nombre in destruccion])[0]
+            nombre_reparacion = random.choices(list(reparacion), weights=[pesos[("reparacion", nombre)] for nombre in reparacion])[0]
+            quitados = destruccion[nombre_destruccion](actual_solution, random.randint(*n_destruir))
+            reparacion[nombre_reparacion](actual_solution, _pendientes(actual_solution, quitados))
+            new_costo = actual_solution.costo_total_tn
+            
+            delta = actual_costo - new_costo
+            aceptada = delta >= 0 or math.exp(delta/t) > random.uniform(0,1)
+            
+            if new_costo < best_costo:
+                valor = puntajes[0]
+            elif new_costo < actual_costo:
+                valor = puntajes[1]
+            elif aceptada:
+                valor = puntajes[2]
+            else:
+                valor = 0
+            
+            for operador in (("destruccion", nombre_destruccion), ("reparacion", nombre_reparacion)):
+                puntaje[operador] += valor
+                usos_segmento[operador] += 1
+                usos[operador] += 1
+                mejoras[operador] += new_costo < best_costo
+            
+            if not aceptada:
+                # Deshacemos los cambios netos de la iteración como un único movimiento.
+                pos_cambios = np.flatnonzero(asignacion_previa != actual_solution.estado.asignacion)
+                cambios = [(ix_pedidos[pos],
+                            ix_camiones[asignacion_previa[pos]] if asignacion_previa[pos] >= 0 else None,
+                            ix_camiones[actual_solution.estado.asignacion[pos]] if actual_solution.estado.asignacion[pos] >= 0 else None)
+                           for pos in pos_cambios]
+                actual_solution.revertir_movimiento(Movimiento("alns", cambios))
+            
+            historial.registrar(actual_costo, new_costo, t, aceptada)
+            
+            if actual_solution.costo_total_tn < best_costo:
+                best_estado = actual_solution.get_estado()
+                best_costo = actual_solution.costo_total_tn
+                solution_history["best_sol"].append(best_costo)
+                ultima_mejora = historial.iteracion
+            
+            if estancamiento is not None and historial.iteracion - ultima_mejora >= estancamiento:
+                motivo_fin = "estancamiento"
+                break
+        
+        # Actualizamos los pesos de los operadores usados en el segmento.
+        for operador in operadores:
+            if usos_segmento[operador] > 0:
+                pesos[operador] = (1 - reaccion)*pesos[operador] + reaccion*puntaje[operador]/usos_segmento[operador]
+            puntaje[operador] = 0.0
+            usos_segmento[operador] = 0
+        
+        historial.fin_temperatura(best_costo)
+        
+        if callback is not None:
+            callback({"segmento": ix_segmento, "temp": t, "iters": historial.iteracion, "actual_sol": actual_solution.costo_total_tn,
+                      "best_sol": best_costo, "pesos": _por_tipo(pesos), "time": time.time() - start})
+        
+        if motivo_fin != "iteraciones":
+            break
+    
+    # Dejamos en la instancia la mejor asignación encontrada.
+    best_solution = actual_solution
+    best_solution.set_estado(best_estado)
+    
+    solution_history["time"] = time.time() - start
+    solution_history["random_state"] = random_state
+    solution_history["iters"] = historial.iteracion
+    solution_history["motivo_fin"] = motivo_fin
+    solution_history["pesos"] = _por_tipo(pesos)
+    solution_history["operadores"] = _por_tipo({operador: {"usos": usos[operador], "mejoras": mejoras[operador]} for operador in operadores})
+    solution_history.update(historial.to_dict())
+    
+    return (best_solution, solution_history)
+
+
+def _pendientes(ruteo, quitados):
+    """
+    Returns:
+        list: ix de los pedidos que se intentan insertar en una iteración de alns(): los quitados y los no asignados
+              vecinos de alguno de ellos, que son los que pueden entrar en el lugar que se liberó.
+    """
+    if not quitados:
+        return []
+    
+    pos_quitados = [ruteo.get_pedido(ix_pedido).pos for ix_pedido in quitados]
+    cercanos = np.unique(np.concatenate([ruteo.vecinos_max[pos] for pos in pos_quitados]))
+    cercanos = cercanos[ruteo.estado.asignacion[cercanos] < 0]
+    
+    return list(quitados) + [ruteo.estado.ix_pedidos[pos] for pos in np.setdiff1d(cercanos, pos_quitados)]
+
+
+def _operadores(operadores, disponibles):
+    """
+    Returns:
+        dict: Operadores de alns() por nombre, a partir de una lista de nombres de disponibles o de un diccionario propio.
+    """
+    if operadores is None:
+        return dict(disponibles)
+    if isinstance(operadores, dict):
+        return dict(operadores)
+    
+    desconocidos = [nombre for nombre in operadores if nombre not in disponibles]
+    if desconocidos:
+        raise ValueError(f"Operadores desconocidos: {desconocidos}. Deben ser de {list(disponibles)}")
+    
+    return {nombre: disponibles[nombre] for nombre in operadores}
+
+
+def _por_tipo(valores):
+    """
+    Returns:
+        dict: Valores por operador (tipo, nombre) agrupados como {tipo: {nombre: valor}}.
+    """
+    agrupados = {"destruccion": {}, "reparacion": {}}
+    for (tipo, nombre), valor in valores.items():
+        agrupados[tipo][nombre] = valor
+    return agrupados
+
+
+def _barra_progreso(temps, **kwargs):
+    """
+    Envuelve las temperaturas en una barra de progreso. tqdm se importa sólo cuando se muestra el progreso.
+    """
+    from tqdm import tqdm
+    return tqdm(temps, **kwargs)
+
+
 def linear_temps(t_inicial, t_final, k):
     temps = list(-np.sort(-np.linspace(t_final, t_inicial+t_final, k)))
     return temps
 
+def time_temps(t_inicial, t_final, start, max_time, inicio=0):
+    """
+    Genera temperaturas según el tiempo transcurrido: cada temperatura se calcula al pedirla, bajando geométricamente
+    desde t_inicial (al comenzar) hasta t_final (al llegar a max_time). El generador no termina; el proceso se corta por tiempo.
+
+    Args:
+        t_inicial (int or float): Temperatura inicial.
+        t_final (int or float): Temperatura final, mayor a 0.
+        start (float): Momento de comienzo del proceso (time.time()).
+        max_time (int or float): Tiempo máximo del proceso en segundos.
+        inicio (int, optional): Índice de la primera temperatura. Defaults to 0.
+
+    Yields:
+        tuple: Índice de la temperatura y temperatura.
+    """
+    ix_temp = inicio
+    while True:
+        avance = min((time.time() - start)/max_time, 1)
+        yield (ix_temp, t_inicial*(t_final/t_inicial)**avance)
+        ix_temp += 1
+
 def non_linear_temps(t_inicial, k):
     temps = [t_inicial * (1-(1/(1+np.exp(-i)))) for i in np.linspace(-6.5, 7, k)]
     return temps
 
 
 def get_history_df(history):
+    """
+    Genera un DataFrame con el historial de sa(), para cualquiera de los modos de historial.
+    En el modo "muestreo" el índice es el número de iteración y en el modo "temperatura" el número de temperatura.
+    """
+    step = history.get("history_step", 1)
     df_history = pd.DataFrame({"temp":history["temp"],
                            "actual_sol":history["actual_sol"],
-                           "new_sol":history["new_sol"]})
+                           "new_sol":history["new_sol"]},
+                           index=np.arange(len(history["temp"]))*step)
+    
+    if "best_sol_temp" in history:
+        df_history = df_history.assign(best_sol = history["best_sol_temp"],
+                                       aceptacion = history["aceptacion"])
+    else:
+        df_history = df_history.assign(best_sol = lambda df_: df_.actual_sol.cummin())
 
     df_history = (df_history
-                .assign(best_sol = lambda df_: df_.actual_sol.cummin(),
-                        delta = lambda df_: df_.actual_sol - df_.new_sol,
+                .assign(delta = lambda df_: df_.actual_sol - df_.new_sol,
                         p = lambda df_: np.exp(df_.delta/df_.temp))
                 .assign(p = lambda df_: np.round(np.where(df_.p > 1, 1, df_.p) ,2)))
 
@@ -122,64 +837,12 @@ def get_history_df(history):
 
 
 def make_history_plots(history):
-    
-    if isinstance(history, dict):
-        df_history = get_history_df(history)
-    else:
-        df_history = history
-    
-    fig1 = px.line(df_history,
-                   x=df_history.index,
-                   y=["new_sol", "actual_sol"],
-                   color_discrete_map={"new_sol":"#4e68c7", "actual_sol":"#db8344"})
-
-    fig2 = px.line(df_history,
-                   x=df_history.index,
-                   y=["delta", "p"],
-                   color_discrete_map={"delta":"#4e68c7", "p":"#d43a22"})
-
-    fig3 = px.line(df_history,
-                   x=df_history.index,
-                   y=["temp"],
-                   color_discrete_map={"temp":"#4e68c7"})
-
-    fig4 = px.line(df_history,
-                   x=df_history.index,
-                   y=["best_sol"],
-                   color_discrete_map={"best_sol":"#22a7d4"})
-    
-    fig = make_subplots(rows=2, cols=2,
-                        column_widths=[0.5, 0.5],
-                        row_heights=[0.5, 0.5],
-                        subplot_titles=['Actual y Nueva Solución', 
-                                        'Temperatura', 
-                                        'Delta y Probabilidad de Cambio', 
-                                        'Mejor Solución'],
-                        shared_xaxes=True)
-
-    traces = []
-    for i, figure in enumerate([fig1, fig2, fig3, fig4]):
-        traces.append([])
-        for trace in range(len(figure["data"])):
-            traces[i].append(figure["data"][trace])
-
-    ubicacion = {0:[1,1], 1:[2,1], 2:[1,2], 3:[2,2]}
-
-    for i in range(4):
-        for trace in traces[i]:
-            fig.append_trace(trace, row=ubicacion[i][0], col=ubicacion[i][1])
-
-    fig.update_layout(template="plotly_white",
-                      height=800,
-                      width=1600,
-                      legend=dict(orientation="h",
-                                  yanchor="bottom",
-                                  y=1.08,
-                                  xanchor="center",
-                                  x=0.5),
-                      hovermode="x")
-
-    fig.show()
+    """
+    Grafica el historial de sa() con plotly. Ver logistica.graficos.make_history_plots().
+    """
+    # plotly se importa sólo al graficar para que el solver no lo requiera.
+    from .graficos import make_history_plots as _make_history_plots
+    _make_history_plots(history)
 
 
 
@@ -222,7 +885,7 @@ def sa_old(ruteo_inicial, t_inicial, t_final, k, iters, prob=1, random_state=1):
     temps = list(-np.sort(-np.arange(t_final, t_inicial+k, k)))
     
     # Para cada temperatura:
-    for t in tqdm(temps):           
+    for t in _barra_progreso(temps):           
         # Para el número de iteraciones por temperatura elegidas.
         for i in range(iters):
             # Copiamos la solución actual y generamos un vecino.
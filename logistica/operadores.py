@@ -0,0 +1,193 @@
+import random
+import numpy as np
+from .estado import costo_cargas
+
+
+# Sesgo de la elección de camiones en los operadores de destrucción por camión: con y = random()**SESGO se eligen con
+# más frecuencia los primeros camiones del orden (los menos cargados o los de mayor costo por tn).
+SESGO = 3
+
+
+def destruir_aleatorio(ruteo, n):
+    """
+    Quita n pedidos asignados elegidos al azar.
+
+    Args:
+        ruteo (Ruteo): Solución a modificar.
+        n (int): Cantidad de pedidos a quitar.
+
+    Returns:
+        list: ix de los pedidos quitados.
+    """
+    asignados = np.flatnonzero(ruteo.estado.asignacion >= 0).tolist()
+    ix_pedidos = [ruteo.estado.ix_pedidos[pos] for pos in random.sample(asignados, min(n, len(asignados)))]
+
+    for ix_pedido in ix_pedidos:
+        ruteo.remove_pedido(ix_pedido)
+
+    return ix_pedidos
+
+
+def destruir_cluster(ruteo, n):
+    """
+    Quita un grupo de pedidos asignados cercanos: un pedido al azar y sus vecinos asignados más cercanos, de modo que
+    la reparación pueda reagruparlos en otros camiones.
+
+    Args:
+        ruteo (Ruteo): Solución a modificar.
+        n (int): Cantidad máxima de pedidos a quitar.
+
+    Returns:
+        list: ix de los pedidos quitados.
+    """
+    asignacion = ruteo.estado.asignacion
+    asignados = np.flatnonzero(asignacion >= 0)
+    if len(asignados) == 0:
+        return []
+
+    semilla = int(random.choice(asignados))
+    vecinos = ruteo.vecinos_max[semilla]
+    vecinos = vecinos[asignacion[vecinos] >= 0]
+    vecinos = vecinos[np.argsort(ruteo.distancias.fila(semilla)[vecinos], kind="stable")]
+
+    ix_pedidos = [ruteo.estado.ix_pedidos[pos] for pos in [semilla] + vecinos[:n - 1].tolist()]
+
+    for ix_pedido in ix_pedidos:
+        ruteo.remove_pedido(ix_pedido)
+
+    return ix_pedidos
+
+
+def destruir_menos_cargados(ruteo, n):
+    """
+    Vacía camiones poco cargados hasta quitar al menos n pedidos, para consolidar su carga en otros camiones
+    (en tramos de menor costo por tn).
+
+    Args:
+        ruteo (Ruteo): Solución a modificar.
+        n (int): Cantidad mínima de pedidos a quitar.
+
+    Returns:
+        list: ix de los pedidos quitados.
+    """
+    estado = ruteo.estado
+    pos_camiones = np.flatnonzero(estado.cantidad_camiones > 0)
+    orden = pos_camiones[np.argsort(estado.carga_camiones[pos_camiones], kind="stable")]
+
+    return _vaciar_camiones(ruteo, orden.tolist(), n)
+
+
+def destruir_peor_costo(ruteo, n):
+    """
+    Vacía camiones con alto costo por tn hasta quitar al menos n pedidos.
+
+    Args:
+        ruteo (Ruteo): Solución a modificar.
+        n (int): Cantidad mínima de pedidos a quitar.
+
+    Returns:
+        list: ix de los pedidos quitados.
+    """
+    estado = ruteo.estado
+    pos_camiones = np.flatnonzero(estado.cantidad_camiones > 0)
+    cargas = estado.carga_camiones[pos_camiones]
+    orden = pos_camiones[np.argsort(-costo_cargas(cargas)/cargas, kind="stable")]
+
+    return _vaciar_camiones(ruteo, orden.tolist(), n)
+
+
+def _vaciar_camiones(ruteo, pos_camiones, n):
+    """
+    Vacía camiones elegidos con sesgo hacia el principio de pos_camiones hasta quitar al menos n pedidos.
+
+    Returns:
+        list: ix de los pedidos quitados.
+    """
+    ix_pedidos = []
+
+    while pos_camiones and len(ix_pedidos) < n:
+        pos = pos_camiones.pop(int(len(pos_camiones)*random.random()**SESGO))
+        camion = ruteo.get_camion(ruteo.estado.ix_camiones[pos])
+
+        for ix_pedido in camion.get_ix_pedidos():
+            ruteo.remove_pedido(ix_pedido)
+            ix_pedidos.append(ix_pedido)
+
+    return ix_pedidos
+
+
+def reparar_greedy(ruteo, ix_pedidos):
+    """
+    Inserta los pedidos, de mayor a menor carga, en el camión en que entran con el menor aumento de costo.
+
+    Args:
+        ruteo (Ruteo): Solución a modificar.
+        ix_pedidos (list): ix de los pedidos no asignados a insertar.
+    """
+    ruteo._insertar_pedidos(sorted([ruteo.get_pedido(ix_pedido) for ix_pedido in ix_pedidos], key=lambda pedido: -pedido.carga))
+    ruteo._update_results()
+
+
+def reparar_regret(ruteo, ix_pedidos):
+    """
+    Inserta los pedidos con el criterio regret-2: en cada paso inserta, en su camión de menor aumento de costo, el pedido
+    con mayor diferencia entre su segunda mejor y su mejor opción (primero los que entran en un único camión). Así los
+    pedidos con pocas alternativas no se quedan sin lugar.
+
+    Al insertar un pedido sólo cambian el costo y la factibilidad del camión que lo recibe, y un camión con más carga
+    nunca pasa a admitir un pedido que antes no entraba. Por eso sólo se recalculan las opciones de los pedidos que
+    entraban en ese camión, y el regret de todos los pedidos es siempre el exacto.
+
+    Args:
+        ruteo (Ruteo): Solución a modificar.
+        ix_pedidos (list): ix de los pedidos no asignados a insertar.
+    """
+    opciones = {ix_pedido: _opciones_insercion(ruteo, ruteo.get_pedido(ix_pedido)) for ix_pedido in ix_pedidos}
+    opciones = {ix_pedido: opcion for ix_pedido, opcion in opciones.items() if opcion is not None}
+
+    while opciones:
+        ix_pedido = max(opciones, key=lambda ix: (opciones[ix][0], ruteo.get_pedido(ix).carga))
+        _, pos_camion, _, _ = opciones.pop(ix_pedido)
+        ruteo.add_pedido(ix_pedido, ruteo.estado.ix_camiones[pos_camion])
+
+        for ix in [ix for ix, opcion in opciones.items() if pos_camion in opcion[3]]:
+            opcion = _opciones_insercion(ruteo, ruteo.get_pedido(ix))
+            if opcion is None:
+                opciones.pop(ix)
+            else:
+                opciones[ix] = opcion
+
+    ruteo._update_results()
+
+
+def _opciones_insercion(ruteo, pedido):
+    """
+    Returns:
+        tuple: Regret del pedido, posiciones de los camiones de su mejor y segunda mejor inserción (-1 si no tiene
+               segunda opción) y conjunto de posiciones de los camiones en que entra, o None si no entra en ningún camión.
+    """
+    directo, _ = ruteo.check_camiones(pedido)
+    pos_camiones = np.flatnonzero(directo)
+    if len(pos_camiones) == 0:
+        return None
+
+    cargas = ruteo.estado.carga_camiones[pos_camiones]
+    aumento = costo_cargas(cargas + pedido.carga) - costo_cargas(cargas)
+    orden = np.argsort(aumento, kind="stable")
+    factibles = set(pos_camiones.tolist())
+
+    if len(orden) == 1:
+        return (np.inf, int(pos_camiones[orden[0]]), -1, factibles)
+
+    return (aumento[orden[1]] - aumento[orden[0]], int(pos_camiones[orden[0]]), int(pos_camiones[orden[1]]), factibles)
+
+
+# Operadores disponibles para alns(), por nombre. Un operador de destrucción recibe el ruteo y la cantidad de pedidos
+# a quitar y devuelve los ix quitados; uno de reparación recibe el ruteo y los ix de los pedidos no asignados a insertar.
+OPERADORES_DESTRUCCION = {"aleatorio": destruir_aleatorio,
+                          "cluster": destruir_cluster,
+                          "menos_cargados": destruir_menos_cargados,
+                          "peor_costo": destruir_peor_costo}
+
+OPERADORES_REPARACION = {"greedy": reparar_greedy,
+                         "regret": reparar_regret}
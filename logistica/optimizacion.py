@@ -0,0 +1,67 @@
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from .ruteo import Ruteo
+from .utils import preparar_df_pedidos
+from . import metaheuristicas as mh
+
+
+def optimizar_dias(df_pedidos, df_camiones, costo_oportunidad, presupuesto, t_inicial, t_final, k, iters, temp_mode="linear",
+                   max_time=None, prob=1, random_state=None, sol_inicial_mode="simple", pedidos_cols=None, max_workers=None):
+    """
+    Optimiza por recocido simulado los pedidos de varios días de manera independiente, repartiendo los días entre procesos.
+    Cada día corresponde a una columna de pedidos de df_pedidos (por defecto las columnas que contienen "pedido").
+
+    Args:
+        df_pedidos (pd.DataFrame): Dataframe con clientes, coordenadas y una columna de pedidos por día.
+        df_camiones (pd.DataFrame): Dataframe con la información de camiones.
+        costo_oportunidad (int or float): Costo de pedidos no asignados en $/tn.
+        presupuesto (int or float): Presupuesto previsto en $/tn.
+        t_inicial, t_final, k, iters, temp_mode, prob, random_state: Argumentos de sa() para cada día.
+        max_time (int or float, optional): Tiempo máximo de optimización de cada día en segundos. Defaults to None.
+        sol_inicial_mode (str, optional): Modo de get_solucion_inicial(). Defaults to "simple".
+        pedidos_cols (list, optional): Columnas de pedidos a optimizar. Defaults to None.
+        max_workers (int, optional): Número de procesos. Con 1 los días se optimizan en el proceso actual. Defaults to None (núcleos disponibles).
+
+    Returns:
+        tuple: Devuelve dos DataFrames con una columna por día:
+               - El resumen de cada ruteo (summary_ruteo) con el tiempo e iteraciones de la optimización.
+               - El camión asignado a cada pedido (columna Camion de summary_pedidos).
+    """
+    if pedidos_cols is None:
+        pedidos_cols = [col for col in df_pedidos.columns if "pedido" in col]
+
+    params = dict(t_inicial=t_inicial, t_final=t_final, k=k, iters=iters, temp_mode=temp_mode, max_time=max_time,
+                  prob=prob, random_state=random_state)
+    args = [(preparar_df_pedidos(df_pedidos, pedidos), df_camiones, costo_oportunidad, presupuesto, sol_inicial_mode, params)
+            for pedidos in pedidos_cols]
+
+    if max_workers == 1:
+        results = [_optimizar_dia(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_optimizar_dia, *zip(*args)))
+
+    # Unimos los resultados de todos los días en una única concatenación.
+    df_results = pd.concat([df_sol for df_sol, _ in results], axis=1)
+    df_results.columns = pedidos_cols
+
+    df_result_pedidos = pd.concat([df_sol_pedidos for _, df_sol_pedidos in results], axis=1)
+    df_result_pedidos.columns = pedidos_cols
+
+    return (df_results, df_result_pedidos)
+
+
+def _optimizar_dia(df_pedido, df_camiones, costo_oportunidad, presupuesto, sol_inicial_mode, params):
+    """
+    Optimiza un día de optimizar_dias(). El Ruteo se construye dentro del proceso y sólo se devuelven los resúmenes.
+    """
+    ruteo = Ruteo(df_camiones, df_pedido, costo_oportunidad=costo_oportunidad, presupuesto=presupuesto)
+    ruteo.get_solucion_inicial(mode=sol_inicial_mode, random_state=params.get("random_state"))
+
+    # El historial de iteraciones no se usa en los resúmenes, por lo que no se registra.
+    best_sol, history = mh.sa(ruteo, progreso=False, history_mode=None, **params)
+
+    df_sol = best_sol.summary_ruteo(time=history.get("time"), iters=history.get("iters"))
+    df_sol_pedidos = best_sol.summary_pedidos()[["Camion"]]
+
+    return (df_sol, df_sol_pedidos)
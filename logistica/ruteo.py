@@ -1,9 +1,29 @@
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import random
+import copy
+from pathlib import Path
 from .componentes import Camion
 from .componentes import Pedido
+from .componentes import Movimiento
+from .componentes import DECIMALES
+from .distancias import MatrizDistancias
+from .distancias import GrillaDistancias
+from .estado import EstadoRuteo
+from .estado import costo_cargas
+
+
+def _columna(datos, col):
+    """
+    Args:
+        datos (pd.DataFrame or dict): Tabla de datos.
+        col (str): Nombre de la columna.
+
+    Returns:
+        np.ndarray: Columna como array de NumPy.
+    """
+    return np.asarray(datos[col])
+
 
 class Ruteo(object):
     """ 
@@ -13,24 +33,74 @@ class Ruteo(object):
         - costo de oportunidad: Costo de pedidos no asignados en $/tn.
         - presupuesto: Presupuesto previsto en $/tn.
         - random_state: Permite definir la semilla para la generación de valores aleatorios.
+        - distancias: Distancias entre pedidos compartidas con los camiones. Según el argumento indice puede ser una
+          matriz precalculada (MatrizDistancias) o un índice espacial de grilla (GrillaDistancias), que no guarda
+          ninguna matriz (n x n) y permite cargar instancias de decenas de miles de pedidos.
+          Con indice="auto" se usa la grilla cuando hay más de MAX_PEDIDOS_MATRIZ pedidos.
+        - estado: Representación compacta (EstadoRuteo) de la solución actual, que se mantiene sincronizada con los objetos.
+        - vecinos_min / vecinos_max: Para cada pedido, posiciones de los otros pedidos a distancia menor o igual a la
+          menor / mayor dist_max de los camiones. Permiten descartar camiones sin pedidos compatibles al generar vecinos.
+        - mascaras: Para cada dist_max de los camiones, máscaras de bits de pedidos compatibles de cada pedido
+          (sólo con la matriz de distancias, ya que su memoria también crece con n^2).
     """
     
-    def __init__(self, df_camiones, df_pedidos, costo_oportunidad, presupuesto):
+    # Cantidad máxima de pedidos para usar la matriz de distancias con indice="auto".
+    MAX_PEDIDOS_MATRIZ = 3000
+    
+    # Atributos con datos estáticos del problema, que se comparten (no se copian) entre copias del Ruteo.
+    _compartidos = ("distancias", "vecinos_min", "vecinos_max", "mascaras")
+    
+    def __init__(self, df_camiones, df_pedidos, costo_oportunidad, presupuesto, indice="auto"):
         self.camiones = self._load_camiones(df_camiones)
         self.pedidos = self._load_pedidos(df_pedidos)
+        self.distancias = self._load_distancias(indice)
+        self.estado = EstadoRuteo.from_ruteo(self)
+        self.vecinos_min, self.vecinos_max = self._load_vecinos()
+        self.mascaras = self._load_mascaras()
         self.costo_oportunidad = costo_oportunidad
         self.presupuesto = presupuesto
         
         # Uso el random state para determinar la generación de solución inicial.
         # self.random_state = random_state
         # random.seed(self.random_state)
+    
+    @classmethod
+    def from_frame(cls, df_camiones, df_pedidos, costo_oportunidad, presupuesto, indice="auto"):
+        """
+        Construye un Ruteo a partir de DataFrames de camiones y pedidos. Es equivalente a Ruteo(...): las columnas
+        se leen como arrays de NumPy y los objetos se crean en bloque, sin recorrer las filas con iterrows().
+
+        Returns:
+            Ruteo: Instancia de Ruteo sin solución generada.
+        """
+        return cls(df_camiones, df_pedidos, costo_oportunidad=costo_oportunidad, presupuesto=presupuesto, indice=indice)
+    
+    @classmethod
+    def from_arrays(cls, camion, carga_max, pedidos_max, dist_max, cliente, pedidos, coord_x, coord_y, costo_oportunidad,
+                    presupuesto, indice="auto"):
+        """
+        Construye un Ruteo directamente a partir de arrays (o listas), sin pasar por DataFrames.
+
+        Args:
+            camion, carga_max, pedidos_max, dist_max (np.ndarray): Columnas de camiones (ver _load_camiones()).
+            cliente, pedidos, coord_x, coord_y (np.ndarray): Columnas de pedidos (ver _load_pedidos()).
+            costo_oportunidad (int or float): Costo de pedidos no asignados en $/tn.
+            presupuesto (int or float): Presupuesto previsto en $/tn.
+            indice (str, optional): Índice de distancias (ver _load_distancias()). Defaults to "auto".
+
+        Returns:
+            Ruteo: Instancia de Ruteo sin solución generada.
+        """
+        camiones = {"camion": camion, "carga_max": carga_max, "pedidos_max": pedidos_max, "dist_max": dist_max}
+        pedidos = {"cliente": cliente, "pedidos": pedidos, "coord_x": coord_x, "coord_y": coord_y}
+        return cls(camiones, pedidos, costo_oportunidad=costo_oportunidad, presupuesto=presupuesto, indice=indice)
         
     def _load_camiones(self, df_camiones):
         """
-        Este método genera el diccionario de camiones a partir de un DataFrame.
+        Este método genera el diccionario de camiones a partir de un DataFrame (o un diccionario de arrays).
 
         Args:
-            df_camiones (pd.DataFrame): Dataframe que contiene la información de camiones.
+            df_camiones (pd.DataFrame or dict): Dataframe que contiene la información de camiones.
                                         El mismo debe contener las siguientes columnas:
                                         - camion: Contiene el identificador ix del camión.
                                         - carga_max: Carga máxima admitida para cada camión.
@@ -40,15 +110,18 @@ class Ruteo(object):
         Returns:
             dict: Diccionario con los camiones del ruteo.
         """
-        dict_camiones = {row.camion:Camion(ix=row.camion, carga_max=row.carga_max, pedidos_max=row.pedidos_max, dist_max=row.dist_max) for _, row in df_camiones.iterrows()}
+        columnas = [_columna(df_camiones, col).tolist() for col in ("camion", "carga_max", "pedidos_max", "dist_max")]
+        dict_camiones = {ix:Camion(ix=ix, carga_max=carga_max, pedidos_max=pedidos_max, dist_max=dist_max, pos=pos)
+                         for pos, (ix, carga_max, pedidos_max, dist_max) in enumerate(zip(*columnas))}
         return dict_camiones
 
     def _load_pedidos(self, df_pedidos):
         """
-        Este método genera el diccionario de pedidos a partir de un DataFrame.
+        Este método genera el diccionario de pedidos a partir de un DataFrame (o un diccionario de arrays).
+        Los pedidos sin carga (pedidos == 0) no se incluyen.
 
         Args:
-            df_pedidos (pd.DataFrame): Dataframe que contiene la información de pedidos.
+            df_pedidos (pd.DataFrame or dict): Dataframe que contiene la información de pedidos.
                                         El mismo debe contener las siguientes columnas:
                                         - cliente: Contiene el identificador ix del pedido.
                                         - pedidos: Carga de cada pedido.
@@ -58,9 +131,103 @@ class Ruteo(object):
         Returns:
             dict: Diccionario con los pedidos del ruteo.
         """
-        dict_pedidos = {row.cliente:Pedido(ix=row.cliente, x=row.coord_x, y=row.coord_y, carga=row.pedidos) for _, row in df_pedidos.iterrows() if row.pedidos != 0}
+        # Los pedidos sin carga se descartan de una sola vez antes de crear los objetos.
+        carga = _columna(df_pedidos, "pedidos")
+        con_carga = carga != 0
+        columnas = [_columna(df_pedidos, col)[con_carga].tolist() for col in ("cliente", "coord_x", "coord_y")]
+        dict_pedidos = {ix:Pedido(ix=ix, x=x, y=y, carga=carga) for ix, x, y, carga in zip(*columnas, carga[con_carga].tolist())}
         return dict_pedidos
     
+    def _load_distancias(self, indice="auto"):
+        """
+        Este método asigna a cada pedido su posición pos y genera las distancias entre todos los pedidos.
+        Se comparten con todos los camiones para que los chequeos de distancia sean búsquedas por posición.
+
+        Args:
+            indice (str, optional): "matriz" para precalcular la matriz de distancias, "grilla" para usar un índice
+                                    espacial de grilla o "auto" para elegir según la cantidad de pedidos. Defaults to "auto".
+
+        Returns:
+            MatrizDistancias or GrillaDistancias: Distancias del ruteo.
+        """
+        for pos, pedido in enumerate(self.get_pedidos()):
+            pedido.pos = pos
+        
+        x = [pedido.x for pedido in self.get_pedidos()]
+        y = [pedido.y for pedido in self.get_pedidos()]
+        
+        if indice == "auto":
+            indice = "matriz" if self.count_pedidos() <= self.MAX_PEDIDOS_MATRIZ else "grilla"
+        
+        if indice == "matriz":
+            distancias = MatrizDistancias(x=x, y=y)
+        elif indice == "grilla":
+            # Las celdas de la grilla tienen el lado de la mayor dist_max, así las búsquedas sólo revisan celdas contiguas.
+            radio = max([camion.dist_max for camion in self.get_camiones()], default=0)
+            distancias = GrillaDistancias(x=x, y=y, radio=radio)
+        else:
+            raise ValueError(f"Índice de distancias desconocido: {indice}")
+        
+        for camion in self.get_camiones():
+            camion.distancias = distancias
+            
+        return distancias
+    
+    def _load_vecinos(self):
+        """
+        Este método genera las listas de pedidos compatibles (vecinos) de cada pedido para la menor y mayor dist_max.
+
+        Returns:
+            tuple: Listas de vecinos para la menor y la mayor dist_max de los camiones.
+        """
+        if self.count_camiones() == 0:
+            return ([], [])
+        
+        dist_min = self.estado.dist_max.min()
+        dist_max = self.estado.dist_max.max()
+        
+        vecinos_max = self.distancias.vecinos(dist_max)
+        vecinos_min = vecinos_max if dist_min == dist_max else self.distancias.vecinos(dist_min)
+        
+        return (vecinos_min, vecinos_max)
+    
+    def _load_mascaras(self):
+        """
+        Este método genera, para cada dist_max distinta de los camiones, la máscara de bits de pedidos compatibles
+        de cada pedido y se la asigna a los camiones con esa dist_max.
+
+        Returns:
+            dict: Diccionario con la lista de máscaras de cada dist_max.
+        """
+        mascaras = {}
+        if not isinstance(self.distancias, MatrizDistancias):
+            return mascaras
+        
+        for camion in self.get_camiones():
+            if camion.dist_max not in mascaras:
+                mascaras[camion.dist_max] = self.distancias.mascaras(camion.dist_max)
+            camion.mascaras = mascaras[camion.dist_max]
+            camion._set_mascara_compatibles()
+            
+        return mascaras
+    
+    def __deepcopy__(self, memo):
+        # Los datos estáticos se registran en memo para que la copia los referencie en lugar de duplicarlos.
+        for attr in self._compartidos:
+            valor = getattr(self, attr, None)
+            memo[id(valor)] = valor
+            # Los camiones referencian directamente los valores de los diccionarios compartidos (por ejemplo las máscaras).
+            if isinstance(valor, dict):
+                for item in valor.values():
+                    memo[id(item)] = item
+        
+        nuevo = self.__class__.__new__(self.__class__)
+        memo[id(self)] = nuevo
+        for attr, valor in self.__dict__.items():
+            setattr(nuevo, attr, copy.deepcopy(valor, memo))
+            
+        return nuevo
+    
     def __str__(self):
         self._set_results()
         return f"--Ruteo--\nCarga Total: {self.carga_total}tn\nCosto Camiones: {self.costo_camiones}$\nCosto Oportunidad: {self.costo_no_asignados}$ \nCosto Total: {self.costo_total}$ \nCosto Total por tn: {self.costo_total_tn}$/tn \nAhorro: {self.ahorro}%"
@@ -126,14 +293,25 @@ class Ruteo(object):
         return len(self.pedidos)
     
         
-    def get_solucion_inicial(self, mode="simple", random_state=1):
+    def get_solucion_inicial(self, mode="simple", random_state=1, asignacion=None):
         """
         Permite generar una solución inicial, es decir, realizar una asignación inicial de pedidos en camiones.
         
         Permite usar varios modos diferentes de generación de solución inicial con el argumento de este método.
 
         Args:
-            mode (_type_): _description_
+            mode (str, optional): Modo de generación:
+                - "simple": Asignación determinística en el orden de camiones y pedidos.
+                - "random": Asignación en orden aleatorio.
+                - "greedy": Construcción por vecindarios que busca los tramos de menor costo por tn
+                            (ver _get_solucion_inicial_greedy()). En instancias grandes suele partir de un costo
+                            mucho menor que "simple", pero no siempre es mejor: en instancias chicas, como las de
+                            data_inputs.xlsx, llenar cada camión al máximo puede dejar pedidos aislados sin lugar.
+                - "warm": Parte de una asignación previa (ver _get_solucion_inicial_warm()). Como la solución
+                          suele estar cerca de la anterior, sa() puede iniciarse con una temperatura baja.
+                Defaults to "simple".
+            random_state (int, optional): Semilla del modo "random". Defaults to 1.
+            asignacion (dict, pd.Series, pd.DataFrame or str, optional): Asignación previa del modo "warm". Defaults to None.
         """
         
         if mode == "simple":
@@ -142,6 +320,14 @@ class Ruteo(object):
         elif mode == "random":
             self._get_solucion_inicial_random(random_state)     
             
+        elif mode == "greedy":
+            self._get_solucion_inicial_greedy()
+            
+        elif mode == "warm":
+            if asignacion is None:
+                raise ValueError("El modo warm requiere una asignación previa")
+            self._get_solucion_inicial_warm(asignacion)
+            
         else:
             self._get_solucion_inicial_simple()
             
@@ -155,10 +341,34 @@ class Ruteo(object):
         Genera una solución inicial deterministica. 
         Para cada camión, toma cada pedido disponible y lo intenta asignar, siendo asignado si pasa los chequeos.
         Queda definido por el orden de carga de camiones y pedidos.
+        
+        Una vez que el camión tiene su primer pedido, sólo pueden entrar pedidos posteriores que sean vecinos de ese
+        pedido, por lo que se recorren únicamente esos. El resultado es el mismo que recorrer todos los pedidos.
         """
+        pedidos = self.get_pedidos()
+        # Posición desde la que hay pedidos sin asignar (todos los anteriores ya están asignados).
+        inicio = 0
+        
         for camion in self.get_camiones():
-            for pedido in self.get_pedidos():
-                camion.add_pedido_checked(pedido)
+            while inicio < len(pedidos) and pedidos[inicio].asignado:
+                inicio += 1
+            
+            # Primer pedido sin asignar que entra en el camión vacío.
+            primero = None
+            for pedido in pedidos[inicio:]:
+                if not pedido.asignado and camion.check_nuevo_pedido(pedido):
+                    camion.add_pedido(pedido)
+                    primero = pedido
+                    break
+            
+            if primero is None:
+                continue
+            
+            for pos in self.vecinos_max[primero.pos]:
+                if camion.count_pedidos() == camion.pedidos_max:
+                    break
+                if pos > primero.pos:
+                    camion.add_pedido_checked(pedidos[pos])
                 
                 
     def _get_solucion_inicial_random(self, random_state=None):
@@ -188,106 +398,322 @@ class Ruteo(object):
                     break
     
     
+    def _get_solucion_inicial_greedy(self, semillas=3):
+        """
+        Genera una solución constructiva que tiene en cuenta los tramos de Camion.costo_carga(), en los que el costo por tn
+        baja al aumentar la carga del camión, y el costo de oportunidad de dejar carga sin asignar.
+            1. Recorre los camiones de mayor a menor carga máxima.
+            2. Para cada camión prueba como semilla los pedidos sin asignar que entran en él con mayor carga sin asignar
+               en su vecindario (la suma de su carga y la de sus vecinos sin asignar a distancia menor o igual a la
+               dist_max del camión), para empezar por los grupos densos de pedidos. Con cada semilla arma una carga
+               first-fit decreasing entre esos vecinos, chequeando también las distancias entre los pedidos elegidos.
+            3. Asigna la carga con la que la solución parcial tiene el menor costo total por tn: el costo del camión
+               con esa carga más el costo de oportunidad de la carga que sigue sin asignar, sobre la carga asignada.
+            4. Inserta los pedidos que quedan sin asignar con _insertar_pedidos().
+
+        Args:
+            semillas (int, optional): Cantidad de semillas a probar por camión. Defaults to 3.
+        """
+        pedidos = self.get_pedidos()
+        carga = self.estado.carga
+        asignado = np.zeros(len(pedidos), dtype=bool)
+        
+        # Vecinos y carga sin asignar del vecindario de cada pedido, para cada dist_max de los camiones.
+        # Se actualiza al asignar cada pedido restando su carga del vecindario de sus vecinos.
+        vecinos = {}
+        densidad = {}
+        for dist_max in set(self.estado.dist_max.tolist()):
+            vecinos[dist_max] = [v[self.distancias.fila(pos)[v] <= dist_max] for pos, v in enumerate(self.vecinos_max)]
+            densidad[dist_max] = carga + np.array([carga[v].sum() for v in vecinos[dist_max]])
+        
+        # Totales de la solución parcial.
+        costo_camiones = sum([camion.get_costo() for camion in self.get_camiones()])
+        carga_asignada = 0
+        carga_no_asignada = carga.sum()
+        
+        for camion in sorted(self.get_camiones(), key=lambda camion: -camion.carga_max):
+            elegibles = np.flatnonzero(~asignado & (carga <= camion.carga_max))
+            if len(elegibles) == 0:
+                continue
+            
+            # Semillas de mayor carga en el vecindario (a igual carga, en el orden de carga de pedidos).
+            densidad_camion = densidad[camion.dist_max]
+            candidatas = elegibles[np.argsort(-densidad_camion[elegibles], kind="stable")[:semillas]]
+            
+            mejor = None
+            for semilla in candidatas:
+                elegidos = self._armar_carga(camion, semilla, asignado)
+                carga_elegidos = carga[elegidos].sum()
+                costo_total = (costo_camiones + Camion.costo_carga(carga_elegidos) - camion.get_costo()
+                               + (carga_no_asignada - carga_elegidos)*self.costo_oportunidad)
+                clave = costo_total/(carga_asignada + carga_elegidos)
+                if mejor is None or clave < mejor[0]:
+                    mejor = (clave, elegidos, carga_elegidos)
+            
+            _, elegidos, carga_elegidos = mejor
+            costo_previo = camion.get_costo()
+            for pos in elegidos:
+                camion.add_pedido(pedidos[pos])
+                asignado[pos] = True
+                for dist_max in densidad:
+                    densidad[dist_max][vecinos[dist_max][pos]] -= carga[pos]
+            
+            costo_camiones += camion.get_costo() - costo_previo
+            carga_asignada += carga_elegidos
+            carga_no_asignada -= carga_elegidos
+        
+        # Sincronizamos el estado y los totales para insertar el resto con check_camiones() y add_pedido().
+        self._set_carga_total()
+        self._set_costo_camiones()
+        self._set_carga_no_asignada()
+        self._set_estado()
+        
+        self._insertar_pedidos([pedidos[pos] for pos in np.argsort(-carga, kind="stable") if not asignado[pos]])
+    
+    def _armar_carga(self, camion, semilla, asignado):
+        """
+        Arma una carga first-fit decreasing para un camión vacío a partir de un pedido semilla.
+
+        Args:
+            camion (Camion): Camión vacío.
+            semilla (int): Posición del pedido semilla.
+            asignado (np.ndarray): Array de bool con los pedidos ya asignados por posición.
+
+        Returns:
+            list: Posiciones de los pedidos elegidos, empezando por la semilla.
+        """
+        carga = self.estado.carga
+        vecinos = self.vecinos_max[semilla]
+        vecinos = vecinos[(self.distancias.fila(semilla)[vecinos] <= camion.dist_max) & ~asignado[vecinos]]
+        vecinos = vecinos[np.argsort(-carga[vecinos], kind="stable")]
+        
+        elegidos = [semilla]
+        carga_total = carga[semilla]
+        for pos in vecinos:
+            if len(elegidos) == camion.pedidos_max:
+                break
+            if (carga_total + carga[pos] <= camion.carga_max
+                    and (self.distancias.fila(pos)[elegidos] <= camion.dist_max).all()):
+                elegidos.append(pos)
+                carga_total += carga[pos]
+        
+        return elegidos
+    
+    def _get_solucion_inicial_warm(self, asignacion):
+        """
+        Genera una solución a partir de una asignación previa (por ejemplo la del día anterior o la de un plan que se re-optimiza).
+            1. Para cada camión, intenta agregar los pedidos que tenía asignados en el orden en que aparecen en la
+               asignación. Se descartan los que ya no cumplen las restricciones y los pedidos o camiones que no existen.
+            2. Inserta los pedidos que quedaron sin asignar, de mayor a menor carga, en el camión en que entran
+               con el menor aumento de costo.
+
+        Args:
+            asignacion (dict, pd.Series, pd.DataFrame or str): Asignación previa (ver _leer_asignacion()).
+        """
+        asignacion = self._leer_asignacion(asignacion)
+        
+        for camion in self.get_camiones():
+            camion.reset_pedidos()
+        for pedido in self.get_pedidos():
+            pedido.asignado = False
+            pedido.camion_ix = None
+        
+        pedidos_camion = {ix_camion: [] for ix_camion in self.camiones}
+        for ix_pedido, ix_camion in asignacion.items():
+            pedidos_camion[ix_camion].append(self.get_pedido(ix_pedido))
+        
+        for ix_camion, pedidos in pedidos_camion.items():
+            camion = self.get_camion(ix_camion)
+            for pedido in pedidos:
+                camion.add_pedido_checked(pedido)
+        
+        # Sincronizamos el estado y los totales para insertar el resto con check_camiones() y add_pedido().
+        self._set_carga_total()
+        self._set_costo_camiones()
+        self._set_carga_no_asignada()
+        self._set_estado()
+        
+        self._insertar_pedidos(sorted([pedido for pedido in self.get_pedidos() if not pedido.asignado], key=lambda pedido: -pedido.carga))
+    
+    def _insertar_pedidos(self, pedidos):
+        """
+        Inserta cada pedido, en el orden dado, en el camión en que entra con el menor aumento de costo.
+        Requiere que el estado y los totales estén sincronizados con la asignación actual.
+
+        Args:
+            pedidos (list): Pedidos no asignados a insertar.
+        """
+        ix_camiones = self.get_ix_camiones()
+        
+        for pedido in pedidos:
+            directo, _ = self.check_camiones(pedido)
+            if not directo.any():
+                continue
+            carga_camiones = self.estado.carga_camiones
+            aumento = costo_cargas(carga_camiones + pedido.carga) - costo_cargas(carga_camiones)
+            pos_camion = np.flatnonzero(directo)[np.argmin(aumento[directo])]
+            self.add_pedido(pedido.ix, ix_camiones[pos_camion])
+    
+    def _leer_asignacion(self, asignacion):
+        """
+        Normaliza una asignación previa a un diccionario de ix de pedido a ix de camión, con sólo los pedidos asignados
+        que existen en el ruteo. Los identificadores se comparan como texto, por lo que sirven las asignaciones leídas
+        de Excel o JSON.
+
+        Args:
+            asignacion (dict, list, pd.Series, pd.DataFrame or str): Asignación previa en alguno de estos formatos:
+                - Diccionario (o lista de pares) de ix de pedido a ix de camión, como get_asignacion().
+                - Serie indexada por pedido, como la columna "Camion" de summary_pedidos().
+                - DataFrame con la columna "Camion", como summary_pedidos().
+                - Ruta a un archivo generado con save_results().
+
+        Returns:
+            dict: Diccionario con el ix del camión asignado a cada ix de pedido.
+        """
+        if isinstance(asignacion, (str, Path)):
+            asignacion = pd.read_excel(asignacion, sheet_name="pedidos", index_col=0)
+        if isinstance(asignacion, pd.DataFrame):
+            asignacion = asignacion["Camion"]
+        asignacion = dict(asignacion.items() if isinstance(asignacion, pd.Series) else asignacion)
+        
+        def texto(ix):
+            # Los ix enteros leídos de Excel con valores faltantes se cargan como float.
+            if isinstance(ix, float) and ix.is_integer():
+                ix = int(ix)
+            return str(ix)
+        
+        ix_pedidos = {texto(ix): ix for ix in self.pedidos}
+        ix_camiones = {texto(ix): ix for ix in self.camiones}
+        
+        resultado = {}
+        for ix_pedido, ix_camion in asignacion.items():
+            ix_pedido = texto(ix_pedido)
+            # Índice de summary_pedidos().
+            if ix_pedido not in ix_pedidos and ix_pedido.startswith("Pedido "):
+                ix_pedido = ix_pedido[len("Pedido "):]
+            if ix_camion is None or pd.isna(ix_camion):
+                continue
+            ix_camion = texto(ix_camion)
+            if ix_pedido in ix_pedidos and ix_camion in ix_camiones:
+                resultado[ix_pedidos[ix_pedido]] = ix_camiones[ix_camion]
+        
+        return resultado
+    
+    
     def get_vecino(self, prob=1):
         """
         Realiza una modificación en la instancia de la solución, creando una nueva solución similar y válida de ruteo.
+        El movimiento se genera con generar_movimiento() y se aplica con aplicar_movimiento().
+
+        Args:
+            prob (int, optional): Probabilidad de reubicar de manera directa un pedido asignado. Defaults to 1.
+
+        Returns:
+            Movimiento: Movimiento aplicado, que puede deshacerse con revertir_movimiento().
+        """
+        movimiento = self.generar_movimiento(prob=prob)
+        self.aplicar_movimiento(movimiento)
+        
+        return movimiento
+    
+    
+    def generar_movimiento(self, prob=1):
+        """
+        Genera un movimiento hacia una nueva solución similar y válida de ruteo, sin modificar la instancia.
         
             1. Se selecciona un pedido al azar entre todos los pedidos. Este es el pedido a modificar (pedido_mod).
             2. Chequeamos si el pedido_mod puede ingresar a un camión de manera directa.
             
             3. Si el pedido ya está asignado:
                 a. Obtenemos el ix del camión al que estaba asignado (camion al que le iría el nuevo pedido en caso de reemplazo).
-                b. Eliminamos el pedido_mod del camión.
                 
                 4. Si el pedido_mod entra directamente en otro camion y prob es mayor al valor aleatorio uniforme(0,1):
                    Con prob = 1 (default) el 100% de las veces que entre directamente irá a esos camiones.
-                    a. Se lo asigna directamente a alguno de los camiones directos al azar.
+                    a. Se lo reubica directamente en alguno de los camiones directos al azar.
                        Si entra de manera directa no hace falta chequear que entre. 
                        No hace falta intercambiar por otro pedido porque entra directo.
                       
                 4. Si el pedido no entra directamente en otro camion:
-                    a. Se genera una lista de ix de pedidos que podrían ser reemplazados en sus camiones por pedido_mod.
-                    b. Se genera una lista de ix de pedidos que podrían ser reemplazados y además que pueden entrar en 
-                       el camión en el que estaba pedido_mod.
+                    a. Se genera una lista de ix de pedidos de otros camiones que podrían ser reemplazados por pedido_mod.
+                    b. Se genera una lista de ix de pedidos que podrían ser reemplazados y además que pueden ocupar 
+                       el lugar de pedido_mod en su camión.
                     
                     5. Si hay al menos 1 pedido reemplazable posible:
-                        a. Se toma un pedido al azar de estos pedidos reemplazables posibles.
-                        b. Se elimina al pedido_reemplazo de su camion.
-                        c. Se asigna el pedido_mod al camión del pedido_reemplazo.
-                        d. Se asigna el pedido_reemplazo en el camión de pedido_mod.
+                        a. Se toma un pedido al azar de estos pedidos reemplazables posibles (pedido_reemplazo).
+                        b. Se intercambian los camiones de pedido_mod y pedido_reemplazo.
                         
                     5. Si no hay al menos 1 pedido reemplazable posible:
-                        a. Se devuelve pedido_mod a su camión original.
+                        a. El movimiento es nulo, pedido_mod se queda en su camión original.
                         
             3. Si el pedido no está asignado:
             
                 4. Si el pedido_mod entra directamente en otro camion:
-                    a. Se lo asigna directamente a alguno de los camiones directos al azar.
-                       Si entra de manera directa no hace falta chequear que entre.
-                       No hace falta intercambiar por otro pedido porque entra directo.
+                    a. Se lo inserta directamente en alguno de los camiones directos al azar.
                        
                 4. Si el pedido no entra directamente en otro camion:
                     a. Se genera una lista de ix de pedidos que podrían ser reemplazados en sus camiones por pedido_mod.
 
                     5. Si hay al menos 1 pedido reemplazable:
-                        a. Se toma un pedido al azar de estos pedidos reemplazables.
-                        b. Se elimina al pedido_reemplazo de su camion.
-                        c. Se asigna el pedido_mod al camión del pedido_reemplazo. El pedido_reemplazo queda sin asignar.
+                        a. Se toma un pedido al azar de estos pedidos reemplazables (pedido_reemplazo).
+                        b. pedido_mod ocupa el lugar de pedido_reemplazo, que queda sin asignar.
+
+        Args:
+            prob (int, optional): Probabilidad de reubicar de manera directa un pedido asignado. Defaults to 1.
 
+        Returns:
+            Movimiento: Movimiento generado.
         """
         
-        ix_pedido_mod = random.choice(self.get_ix_pedidos())
+        ix_pedido_mod = random.choice(self.estado.ix_pedidos)
         pedido_mod = self.get_pedido(ix_pedido_mod)
         
+        # Chequeamos todos los camiones a la vez: ingresos directos y pedidos que podría reemplazar.
+        directo, intercambio = self.check_camiones(pedido_mod)
+        
         # Índices de los camiones en los que podría entrar directamente.
-        ix_camion_directo = [camion.ix for camion in self.get_camiones() if camion.check_nuevo_pedido(pedido_mod)]
+        ix_camion_directo = [self.estado.ix_camiones[pos] for pos in np.flatnonzero(directo)]
         
         # Si el pedido_mod ya está seleccionado:
         if pedido_mod.asignado:
             
             # Obtenemos el ix del camion al que pertenece pedido_mod
             ix_camion_mod = pedido_mod.camion_ix
-            # Eliminamos de su camión a pedido_mod.
-            self.get_camion(ix_camion_mod).remove_pedido(pedido_mod.ix)
+            camion_mod = self.get_camion(ix_camion_mod)
             
             # Si el pedido_mod entra de manera directa en otro camión, es asignado de manera directa a alguno de esos camiones al azar.
             if len(ix_camion_directo) > 0 and prob >= random.uniform(0,1):
                 
-                # Se elige un camión directo para cambiar 
+                # Se elige un camión directo para cambiar.
                 ix_camion_new = random.choice(ix_camion_directo)
-                # No hace falta chequear de que entre porque fue revisado previamente.
-                self.get_camion(ix_camion_new).add_pedido(pedido_mod)
+                
+                # Si el camión elegido es el propio la solución no cambia.
+                if ix_camion_new == ix_camion_mod:
+                    return Movimiento("nulo")
+                
+                return Movimiento("reubicar", [(ix_pedido_mod, ix_camion_mod, ix_camion_new)])
                 
             # Si el pedido no entra directamente en un camión debemos reemplazar pedidos.
             else:
                 
-                ix_pedidos_reemplazables = []
-                
-                # Obtengo todos los ix de pedidos que podrían ser reemplazados por pedido_mod en sus camiones.
-                for camion in self.get_camiones():
-                    ix_pedidos_reemplazables += camion.check_intercambio_pedido(pedido_mod)
-                               
-                ix_pedidos_reemplazables_posibles = []
+                # Posiciones de pedidos que podrían ser reemplazados por pedido_mod en sus camiones.
+                pos_reemplazables = np.flatnonzero(intercambio)
                 
                 # Para que sea posible el intercambio tenemos que quedarnos con los ix de pedidos
-                # que entrarían en el camión donde estaba pedido_mod.                
-                for ix_pedido_reemplazable in ix_pedidos_reemplazables:
-                    pedido_reemplazable = self.get_pedido(ix_pedido_reemplazable)
-                    if self.get_camion(ix_camion_mod).check_nuevo_pedido(pedido_reemplazable):
-                        ix_pedidos_reemplazables_posibles += ix_pedido_reemplazable
+                # que podrían ocupar el lugar de pedido_mod en su camión.
+                pos_reemplazables = pos_reemplazables[self._check_reemplazo(camion_mod, pedido_mod, pos_reemplazables)]
+                ix_pedidos_reemplazables_posibles = [self.estado.ix_pedidos[pos] for pos in pos_reemplazables]
                         
                 # Si tengo al menos un reemplazo posible.
                 if len(ix_pedidos_reemplazables_posibles) > 0:
                     pedido_reemplazo = self.get_pedido(random.choice(ix_pedidos_reemplazables_posibles))
                     ix_camion_new = pedido_reemplazo.camion_ix
-                    self.get_camion(ix_camion_new).remove_pedido(pedido_reemplazo.ix)
                     
-                    self.get_camion(ix_camion_new).add_pedido(pedido_mod)
-                    self.get_camion(ix_camion_mod).add_pedido(pedido_reemplazo)
+                    return Movimiento("intercambiar", [(ix_pedido_mod, ix_camion_mod, ix_camion_new),
+                                                       (pedido_reemplazo.ix, ix_camion_new, ix_camion_mod)])
                     
-                # Si no tengo ningún reemplazo posible reasigno pedido_mod a su camión original.
+                # Si no tengo ningún reemplazo posible pedido_mod se queda en su camión original.
                 else:
-                    self.get_camion(ix_camion_mod).add_pedido_checked(pedido_mod)
+                    return Movimiento("nulo")
 
         # Si el pedido no está asignado:
         else:
@@ -297,41 +723,379 @@ class Ruteo(object):
                 
                 # Se elige un camión directo para cambiar 
                 ix_camion_new = random.choice(ix_camion_directo)
-                # No hace falta chequear de que entre porque fue revisado previamente.
-                self.get_camion(ix_camion_new).add_pedido(pedido_mod)
+                
+                return Movimiento("insertar", [(ix_pedido_mod, None, ix_camion_new)])
                 
             # Si el pedido no entra directamente en un camión debemos reemplazar pedidos.   
             else:
                 
-                ix_pedidos_reemplazables = []
-                
                 # Obtengo todos los ix de pedidos que podrían ser reemplazados por pedido_mod en sus camiones.
-                for camion in self.get_camiones():
-                    ix_pedidos_reemplazables += camion.check_intercambio_pedido(pedido_mod)
+                ix_pedidos_reemplazables = [self.estado.ix_pedidos[pos] for pos in np.flatnonzero(intercambio)]
 
-                # QUE PASA SI NO TENGO NINGUNO
                 if len(ix_pedidos_reemplazables) > 0:
                     pedido_reemplazo = self.get_pedido(random.choice(ix_pedidos_reemplazables))
                     ix_camion_new = pedido_reemplazo.camion_ix
-                    self.get_camion(ix_camion_new).remove_pedido(pedido_reemplazo.ix)
                     
-                    self.get_camion(ix_camion_new).add_pedido(pedido_mod)
+                    return Movimiento("reemplazar", [(pedido_reemplazo.ix, ix_camion_new, None),
+                                                     (ix_pedido_mod, None, ix_camion_new)])
+                
+                # Si no hay ningún pedido reemplazable la solución no cambia.
+                else:
+                    return Movimiento("nulo")
+    
+    
+    def generar_movimientos_pedido(self, ix_pedido):
+        """
+        Genera todos los movimientos válidos que mueven a un pedido, sin modificar la instancia. Son los mismos tipos de
+        movimiento que puede generar generar_movimiento() al elegir ese pedido, pero sin elegir al azar entre los
+        camiones y pedidos posibles:
+            - Si el pedido está asignado: reubicarlo en cada camión en que entra directamente e intercambiarlo con cada
+              pedido de otro camión que puede ocupar su lugar.
+            - Si el pedido no está asignado: insertarlo en cada camión en que entra directamente y que reemplace a cada
+              pedido asignado que puede reemplazar.
+
+        Args:
+            ix_pedido (int or str): Identificador del pedido.
+
+        Returns:
+            list: Lista de Movimiento.
+        """
+        pedido = self.get_pedido(ix_pedido)
+        ix_camiones = self.estado.ix_camiones
+        ix_pedidos = self.estado.ix_pedidos
+        
+        directo, intercambio = self.check_camiones(pedido)
+        ix_camion_directo = [ix_camiones[pos] for pos in np.flatnonzero(directo)]
+        pos_reemplazables = np.flatnonzero(intercambio)
+        
+        if pedido.asignado:
+            ix_camion_mod = pedido.camion_ix
+            pos_reemplazables = pos_reemplazables[self._check_reemplazo(self.get_camion(ix_camion_mod), pedido, pos_reemplazables)]
+            
+            movimientos = [Movimiento("reubicar", [(ix_pedido, ix_camion_mod, ix_camion_new)])
+                           for ix_camion_new in ix_camion_directo if ix_camion_new != ix_camion_mod]
+            
+            for pos in pos_reemplazables:
+                pedido_reemplazo = self.get_pedido(ix_pedidos[pos])
+                movimientos.append(Movimiento("intercambiar", [(ix_pedido, ix_camion_mod, pedido_reemplazo.camion_ix),
+                                                               (pedido_reemplazo.ix, pedido_reemplazo.camion_ix, ix_camion_mod)]))
+        else:
+            movimientos = [Movimiento("insertar", [(ix_pedido, None, ix_camion_new)]) for ix_camion_new in ix_camion_directo]
+            
+            for pos in pos_reemplazables:
+                pedido_reemplazo = self.get_pedido(ix_pedidos[pos])
+                movimientos.append(Movimiento("reemplazar", [(pedido_reemplazo.ix, pedido_reemplazo.camion_ix, None),
+                                                             (ix_pedido, None, pedido_reemplazo.camion_ix)]))
+        
+        return movimientos
+    
+    
+    def add_pedido(self, ix_pedido, ix_camion):
+        """
+        Agrega un pedido no asignado a un camión, actualizando los totales del ruteo de manera incremental.
+        Este método no realiza los chequeos de las restricciones del camión.
+
+        Args:
+            ix_pedido (int or str): Identificador del pedido.
+            ix_camion (int or str): Identificador del camión.
+        """
+        pedido = self.get_pedido(ix_pedido)
+        
+        if not pedido.asignado:
+            camion = self.get_camion(ix_camion)
+            costo_previo = camion.get_costo()
+            camion.add_pedido(pedido)
+            
+            self.costo_camiones = round(self.costo_camiones + camion.get_costo() - costo_previo, DECIMALES)
+            self.carga_total = round(self.carga_total + pedido.carga, DECIMALES)
+            self.carga_no_asignada = round(self.carga_no_asignada - pedido.carga, DECIMALES)
+            self.estado.asignar(pedido.pos, camion.pos)
+    
+    def remove_pedido(self, ix_pedido):
+        """
+        Elimina un pedido asignado de su camión, actualizando los totales del ruteo de manera incremental.
+
+        Args:
+            ix_pedido (int or str): Identificador del pedido.
+        """
+        pedido = self.get_pedido(ix_pedido)
+        
+        if pedido.asignado:
+            camion = self.get_camion(pedido.camion_ix)
+            costo_previo = camion.get_costo()
+            camion.remove_pedido(ix_pedido)
+            self.estado.desasignar(pedido.pos)
+            
+            self.costo_camiones = round(self.costo_camiones + camion.get_costo() - costo_previo, DECIMALES)
+            self.carga_total = round(self.carga_total - pedido.carga, DECIMALES)
+            self.carga_no_asignada = round(self.carga_no_asignada + pedido.carga, DECIMALES)
+    
+    def check_camiones(self, pedido):
+        """
+        Versión vectorizada de check_nuevo_pedido() y check_intercambio_pedido() para todos los camiones a la vez.
+        Usa los arrays de carga y cantidad de pedidos del estado y las distancias a los pedidos vecinos, por lo que
+        no recorre los camiones ni sus pedidos asignados.
+
+        Args:
+            pedido (Pedido): Pedido a chequear.
+
+        Returns:
+            tuple: Devuelve dos arrays de bool:
+                   - Por posición de camión, si el pedido puede ingresar directamente al camión.
+                   - Por posición de pedido, si el pedido puede reemplazar a ese pedido asignado en su camión
+                     (sin considerar a los pedidos de su propio camión).
+        """
+        estado = self.estado
+        asignacion = estado.asignacion
+        pos_camion_propio = asignacion[pedido.pos]
+        
+        # Pedidos vecinos asignados que son compatibles con el pedido según la dist_max de su camión.
+        vecinos = self.vecinos_max[pedido.pos]
+        pos_camiones = asignacion[vecinos]
+        asignados = pos_camiones >= 0
+        vecinos = vecinos[asignados]
+        pos_camiones = pos_camiones[asignados]
+        compatibles = self.distancias.fila(pedido.pos)[vecinos] <= estado.dist_max[pos_camiones]
         
-        #print(f"Pedido {ix_pedido_mod} a Camion {ix_camion_new}")
+        # Cantidad de pedidos de cada camión que no son compatibles con el pedido.
+        # El propio pedido es compatible consigo mismo.
+        n_compatibles = np.bincount(pos_camiones[compatibles], minlength=estado.count_camiones())
+        if pos_camion_propio >= 0:
+            n_compatibles[pos_camion_propio] += 1
+        n_conflictos = estado.cantidad_camiones - n_compatibles
+        
+        directo = ((estado.carga_camiones + pedido.carga <= estado.carga_max)
+                   & (estado.cantidad_camiones < estado.pedidos_max)
+                   & (n_conflictos == 0))
+        
+        # Un pedido asignado puede ser reemplazado si la carga lo permite y es el único conflicto de su camión.
+        es_compatible = np.zeros(estado.count_pedidos(), dtype=bool)
+        es_compatible[vecinos[compatibles]] = True
+        pos_camion = np.where(asignacion >= 0, asignacion, 0)
+        
+        intercambio = ((asignacion >= 0)
+                       & (asignacion != pos_camion_propio)
+                       & (estado.carga_camiones[pos_camion] + pedido.carga - estado.carga <= estado.carga_max[pos_camion])
+                       & (n_conflictos[pos_camion] - ~es_compatible == 0))
+        
+        return (directo, intercambio)
+    
+    def _check_reemplazo(self, camion, pedido_saliente, pos_pedidos):
+        """
+        Chequea qué pedidos pueden ocupar el lugar de pedido_saliente en camion (carga y distancia con el resto de pedidos).
+
+        Args:
+            camion (Camion): Camión del que sale pedido_saliente.
+            pedido_saliente (Pedido): Pedido que deja el camión.
+            pos_pedidos (np.ndarray): Posiciones de los pedidos candidatos.
+
+        Returns:
+            np.ndarray: Array de bool con los candidatos que pueden ocupar su lugar.
+        """
+        posibles = camion.carga_total + self.estado.carga[pos_pedidos] - pedido_saliente.carga <= camion.carga_max
+        
+        for pedido_restante in camion.get_pedidos():
+            if pedido_restante.ix != pedido_saliente.ix:
+                posibles &= self.distancias.fila(pedido_restante.pos)[pos_pedidos] <= camion.dist_max
+                
+        return posibles
+    
+    def aplicar_movimiento(self, movimiento):
+        """
+        Aplica un movimiento sobre la instancia. Primero se quitan todos los pedidos de sus camiones de origen
+        y luego se agregan en sus camiones de destino. Este método no realiza los chequeos de las restricciones.
+
+        Args:
+            movimiento (Movimiento): Movimiento a aplicar.
+        """
+        for ix_pedido, ix_origen, _ in movimiento.cambios:
+            if ix_origen is not None:
+                self.remove_pedido(ix_pedido)
+                
+        for ix_pedido, _, ix_destino in movimiento.cambios:
+            if ix_destino is not None:
+                self.add_pedido(ix_pedido, ix_destino)
+        
+        # Actualizamos los resultados de la solución a partir de los totales.
+        self._update_results()
+        
+    def revertir_movimiento(self, movimiento):
+        """
+        Deshace un movimiento aplicado previamente sobre la instancia.
+
+        Args:
+            movimiento (Movimiento): Movimiento a revertir.
+        """
+        self.aplicar_movimiento(movimiento.inverso())
+        
+    def evaluar_movimiento(self, movimiento):
+        """
+        Calcula la variación del costo total por tn que produciría un movimiento, sin modificar la instancia.
+        Sólo se recalcula el costo de los camiones involucrados en el movimiento.
+        
+        Las cargas se acumulan en el mismo orden que en aplicar_movimiento(), por lo que el costo evaluado
+        coincide exactamente con el que se obtiene al aplicarlo.
+
+        Args:
+            movimiento (Movimiento): Movimiento a evaluar.
+
+        Returns:
+            float: Diferencia entre el costo total por tn con el movimiento aplicado y el costo actual.
+        """
+        return self.evaluar_costo_total_tn(movimiento) - self.costo_total_tn
+    
+    def evaluar_costo_total_tn(self, movimiento):
+        """
+        Args:
+            movimiento (Movimiento): Movimiento a evaluar.
+
+        Returns:
+            float: Costo total por tn que tendría la solución con el movimiento aplicado, sin modificar la instancia.
+        """
+        cargas = {}
+        carga_total = self.carga_total
+        carga_no_asignada = self.carga_no_asignada
+        
+        for ix_pedido, ix_origen, _ in movimiento.cambios:
+            if ix_origen is not None:
+                carga = self.get_pedido(ix_pedido).carga
+                cargas[ix_origen] = round(cargas.get(ix_origen, self.get_camion(ix_origen).carga_total) - carga, DECIMALES)
+                carga_total = round(carga_total - carga, DECIMALES)
+                carga_no_asignada = round(carga_no_asignada + carga, DECIMALES)
+                
+        for ix_pedido, _, ix_destino in movimiento.cambios:
+            if ix_destino is not None:
+                carga = self.get_pedido(ix_pedido).carga
+                cargas[ix_destino] = round(cargas.get(ix_destino, self.get_camion(ix_destino).carga_total) + carga, DECIMALES)
+                carga_total = round(carga_total + carga, DECIMALES)
+                carga_no_asignada = round(carga_no_asignada - carga, DECIMALES)
+        
+        costo_camiones = self.costo_camiones
+        for ix_camion, carga in cargas.items():
+            costo_camiones = round(costo_camiones + Camion.costo_carga(carga) - self.get_camion(ix_camion).get_costo(), DECIMALES)
+            
+        costo_total = costo_camiones + carga_no_asignada*self.costo_oportunidad
+        
+        return round(costo_total/carga_total, 2)
+
+    def evaluar_movimientos(self, movimientos):
+        """
+        Versión vectorizada de evaluar_costo_total_tn() para un lote de movimientos generados sobre la misma solución.
+        Los cambios de cada movimiento se recorren una única vez y los costos de todos los camiones involucrados
+        se calculan juntos con costo_cargas().
+
+        Args:
+            movimientos (list): Lista de Movimiento a evaluar.
+
+        Returns:
+            np.ndarray: Costo total por tn que tendría la solución con cada movimiento aplicado, sin modificar la instancia.
+        """
+        n = len(movimientos)
+        filas, camiones, salidas, entradas = [], [], [], []
+        delta_carga = np.zeros(n)
+
+        for fila, movimiento in enumerate(movimientos):
+            # Carga que sale y que entra de cada camión involucrado en el movimiento.
+            involucrados = {}
+            for ix_pedido, ix_origen, ix_destino in movimiento.cambios:
+                carga = self.get_pedido(ix_pedido).carga
+                if ix_origen is not None:
+                    involucrados.setdefault(ix_origen, [0, 0])[0] += carga
+                    delta_carga[fila] -= carga
+                if ix_destino is not None:
+                    involucrados.setdefault(ix_destino, [0, 0])[1] += carga
+                    delta_carga[fila] += carga
+
+            for ix_camion, (salida, entrada) in involucrados.items():
+                filas.append(fila)
+                camiones.append(self.get_camion(ix_camion).pos)
+                salidas.append(salida)
+                entradas.append(entrada)
+
+        # Las cargas nuevas se acumulan en el mismo orden que en aplicar_movimiento(): primero salidas y luego entradas.
+        cargas_previas = self.estado.carga_camiones[np.asarray(camiones, dtype=np.int64)]
+        cargas_nuevas = np.round(np.round(cargas_previas - np.asarray(salidas), DECIMALES) + np.asarray(entradas), DECIMALES)
+        delta_costo = np.bincount(np.asarray(filas, dtype=np.int64), costo_cargas(cargas_nuevas) - costo_cargas(cargas_previas),
+                                  minlength=n)
+
+        costo_camiones = np.round(self.costo_camiones + delta_costo, DECIMALES)
+        carga_total = np.round(self.carga_total + delta_carga, DECIMALES)
+        carga_no_asignada = np.round(self.carga_no_asignada - delta_carga, DECIMALES)
+        costo_total = costo_camiones + carga_no_asignada*self.costo_oportunidad
+
+        return np.round(costo_total/carga_total, 2)
+
+    def get_asignacion(self):
+        """
+        Returns:
+            dict: Diccionario con el ix del camión asignado a cada ix de pedido (None si no está asignado).
+        """
+        return {pedido.ix: pedido.camion_ix for pedido in self.get_pedidos()}
+    
+    def set_asignacion(self, asignacion):
+        """
+        Reemplaza la asignación de pedidos de la instancia por la asignación pasada como argumento.
+        Este método no realiza los chequeos de las restricciones.
+
+        Args:
+            asignacion (dict): Diccionario con el ix del camión asignado a cada ix de pedido (None si no está asignado).
+        """
+        for camion in self.get_camiones():
+            camion.reset_pedidos()
+            
+        for pedido in self.get_pedidos():
+            pedido.asignado = False
+            pedido.camion_ix = None
+            
+        for ix_pedido, ix_camion in asignacion.items():
+            if ix_camion is not None:
+                self.get_camion(ix_camion).add_pedido(self.get_pedido(ix_pedido))
+        
+        # Generamos los resultados de la solución.
+        self._set_results()
+    
+    def get_estado(self):
+        """
+        Returns:
+            EstadoRuteo: Copia compacta de la solución actual. Copiarla sólo implica copiar los arrays de la asignación.
+        """
+        return self.estado.copy()
+    
+    def set_estado(self, estado):
+        """
+        Reemplaza la solución de la instancia por la de un EstadoRuteo, materializando la asignación en los camiones y pedidos.
+        Este método no realiza los chequeos de las restricciones.
+
+        Args:
+            estado (EstadoRuteo): Estado compacto generado a partir de este ruteo (mismo orden de pedidos y camiones).
+        """
+        pedidos = self.get_pedidos()
+        camiones = self.get_camiones()
+        
+        for camion in camiones:
+            camion.reset_pedidos()
+            
+        for pedido, pos_camion in zip(pedidos, estado.asignacion.tolist()):
+            pedido.asignado = False
+            pedido.camion_ix = None
+            if pos_camion >= 0:
+                camiones[pos_camion].add_pedido(pedido)
         
         # Generamos los resultados de la solución.
-        self._set_results()    
+        self._set_results()
     
     
     def _set_carga_total(self):
-        self.carga_total = sum([camion.get_carga_total() for camion in self.camiones.values()])
+        self.carga_total = round(sum([camion.get_carga_total() for camion in self.camiones.values()]), DECIMALES)
         
     def _set_costo_camiones(self):
-        self.costo_camiones = sum([camion.get_costo() for camion in self.camiones.values()])
+        self.costo_camiones = round(sum([camion.get_costo() for camion in self.camiones.values()]), DECIMALES)
+        
+    def _set_carga_no_asignada(self):
+        self.carga_no_asignada = round(sum([pedido.get_carga() for pedido in self.pedidos.values() if not pedido.asignado]), DECIMALES)
         
     def _set_costo_no_asignados(self):
-        carga_no_asignada = sum([pedido.get_carga() for pedido in self.pedidos.values() if not pedido.asignado])
-        self.costo_no_asignados = carga_no_asignada*self.costo_oportunidad
+        self.costo_no_asignados = self.carga_no_asignada*self.costo_oportunidad
         
     def _set_costo_total(self):
         self.costo_total = self.costo_camiones + self.costo_no_asignados
@@ -343,8 +1107,22 @@ class Ruteo(object):
         self.ahorro = round(((self.costo_total_tn - self.presupuesto)/self.presupuesto)*100, 2)
 
     def _set_results(self):
+        """
+        Recalcula todos los resultados de la solución recorriendo camiones y pedidos.
+        """
         self._set_carga_total()
         self._set_costo_camiones()
+        self._set_carga_no_asignada()
+        self._set_estado()
+        self._update_results()
+        
+    def _set_estado(self):
+        self.estado.set_asignacion([self.get_camion(pedido.camion_ix).pos if pedido.asignado else -1 for pedido in self.pedidos.values()])
+        
+    def _update_results(self):
+        """
+        Actualiza los resultados de la solución a partir de los totales que mantienen add_pedido() y remove_pedido().
+        """
         self._set_costo_no_asignados()
         self._set_costo_total()
         self._set_costo_total_tn()
@@ -409,41 +1187,12 @@ class Ruteo(object):
     
     
     def plot_solution(self):
-        node_ix = []
-        node_x = []
-        node_y = []
-        node_carga = []
-        node_ix_camion = []
-
-        for pedido in self.get_pedidos():
-            node_ix.append(pedido.ix)
-            node_x.append(pedido.x)
-            node_y.append(pedido.y)
-            node_carga.append(pedido.carga)
-            node_ix_camion.append(str(pedido.camion_ix) if pedido.asignado else "No Asignado")
-
-        cat_order = list(set(node_ix_camion))
-        cat_order.sort()
-
-        fig = px.scatter(x=node_x,
-                         y=node_y,
-                         size=node_carga,
-                         color=node_ix_camion,
-                         text=node_ix,
-                         category_orders={"color":cat_order},
-                         color_discrete_sequence=px.colors.qualitative.Prism,
-                         height=600,
-                         width=700,
-                         template="plotly_white")
-        
-        # fig.update_traces(hovertemplate=
-        #               "<b>%{text}</b><br><br>" +
-        #               "GDP per Capita: %{x:$,.0f}<br>" +
-        #               "Life Expectation: %{y:.0%}<br>" +
-        #               "Population: %{marker.size:,}" +
-        #               "<extra></extra>")
-
-        fig.show()
+        """
+        Grafica la solución con plotly. Ver logistica.graficos.plot_solution().
+        """
+        # plotly se importa sólo al graficar para que el solver no lo requiera.
+        from .graficos import plot_solution
+        plot_solution(self)
         
         
     def save_results(self, path):
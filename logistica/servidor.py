@@ -0,0 +1,303 @@
+"""
+Servidor local de optimización de ruteos.
+
+Mantiene un pool de procesos precalentados (con los módulos del solver ya importados) y atiende trabajos por TCP con
+un protocolo de líneas JSON: cada línea que envía el cliente es un trabajo y el servidor responde con una línea JSON por
+evento del trabajo ("encolado", "inicio", "progreso" al terminar cada temperatura, y "resultado" o "error").
+Los trabajos de distintos clientes, o de un mismo cliente, se resuelven en paralelo sin bloquearse entre sí.
+
+Cada proceso guarda los últimos Ruteos construidos (con sus distancias, vecinos y máscaras precalculadas) identificados
+por flota, pedidos y parámetros. Sólo se reutilizan al repetir la misma instancia, por ejemplo al re-optimizar un plan con
+otros parámetros o con una asignación previa: todo lo costoso de construir un Ruteo depende de los pedidos, por lo que
+los pedidos de un nuevo día sobre la misma flota construyen el Ruteo de nuevo.
+
+Cada trabajo es un diccionario con:
+    - camiones: Datos de camiones con las columnas de la hoja camiones (camion, carga_max, pedidos_max, dist_max),
+      como diccionario de columnas o lista de registros.
+    - pedidos: Datos de pedidos con el esquema de preparar_df_pedidos() (cliente, pedidos, coord_x, coord_y).
+    - costo_oportunidad, presupuesto: Parámetros del Ruteo.
+    - sol_inicial_mode (opcional): Modo de get_solucion_inicial(). Por defecto "simple".
+    - asignacion (opcional): Asignación previa del modo "warm", por ejemplo la de un resultado anterior.
+    - params: Argumentos de sa() (t_inicial, t_final, k, iters, ...). Con "max_time" y "temp_mode": "tiempo" el
+      trabajo termina en un tiempo fijo.
+
+Uso:
+
+    python -m logistica.servidor --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import collections
+import copy
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .ruteo import Ruteo
+from . import metaheuristicas as mh
+
+
+class ServidorRuteo(object):
+    """
+    La clase ServidorRuteo atiende trabajos de optimización sobre asyncio:
+        - host, port: Dirección en la que escucha. Con port=0 se elige un puerto libre (disponible en port al iniciar).
+        - max_workers: Cantidad de procesos del pool. Defaults to None (núcleos disponibles).
+        - cache_size: Cantidad de ruteos precalculados (distancias y vecinos) que guarda cada proceso entre trabajos.
+                      Sólo se reutilizan para la misma instancia (misma flota, pedidos y parámetros).
+
+    Los procesos envían los eventos de cada trabajo por una única cola compartida, que un hilo del servidor reparte
+    entre los trabajos en curso.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, max_workers=None, cache_size=8):
+        self.host = host
+        self.port = port
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.trabajos = {}
+        self._ids = itertools.count(1)
+
+    async def iniciar(self):
+        """
+        Crea y precalienta el pool de procesos y comienza a escuchar conexiones.
+        """
+        self.loop = asyncio.get_running_loop()
+        contexto = multiprocessing.get_context()
+        self.cola = contexto.Queue()
+        self.pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=contexto, initializer=_iniciar_worker,
+                                        initargs=(self.cola, self.cache_size))
+
+        # Lanzamos todos los procesos antes de recibir trabajos para no pagar su arranque en el primero.
+        await asyncio.gather(*[self.loop.run_in_executor(self.pool, _calentar) for _ in range(self.max_workers)])
+
+        self.lector = threading.Thread(target=self._leer_eventos, daemon=True)
+        self.lector.start()
+
+        self.server = await asyncio.start_server(self._atender, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def cerrar(self):
+        """
+        Deja de escuchar conexiones y cierra el pool de procesos.
+        """
+        self.server.close()
+        await self.server.wait_closed()
+        self.pool.shutdown(wait=True)
+        self.cola.put(None)
+        self.lector.join()
+
+    async def servir(self):
+        """
+        Inicia el servidor y atiende conexiones hasta que se cancele.
+        """
+        await self.iniciar()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            await self.cerrar()
+
+    def _leer_eventos(self):
+        # Hilo que reparte los eventos de los procesos entre las colas asyncio de cada trabajo.
+        while True:
+            evento = self.cola.get()
+            if evento is None:
+                break
+            self.loop.call_soon_threadsafe(self._despachar, evento)
+
+    def _despachar(self, evento):
+        cola = self.trabajos.get(evento["job"])
+        if cola is not None:
+            cola.put_nowait(evento)
+
+    async def _atender(self, reader, writer):
+        # Cada línea recibida es un trabajo independiente.
+        tareas = []
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                tareas.append(asyncio.create_task(self._resolver(linea, writer)))
+            await asyncio.gather(*tareas)
+        except (asyncio.CancelledError, ConnectionError):
+            # Cierre del servidor o desconexión del cliente: se abandonan los trabajos pendientes de la conexión.
+            for tarea in tareas:
+                tarea.cancel()
+        finally:
+            writer.close()
+
+    async def _resolver(self, linea, writer):
+        job = next(self._ids)
+        cola = asyncio.Queue()
+        self.trabajos[job] = cola
+
+        try:
+            try:
+                trabajo = json.loads(linea)
+            except ValueError as error:
+                await _enviar(writer, {"evento": "error", "job": job, "mensaje": f"JSON inválido: {error}"})
+                return
+
+            await _enviar(writer, {"evento": "encolado", "job": job})
+            futuro = self.loop.run_in_executor(self.pool, _resolver_trabajo, job, trabajo)
+            
+            def informar_error(futuro):
+                # Los errores del pool (por ejemplo un proceso caído) no pasan por la cola de eventos.
+                if futuro.cancelled():
+                    return
+                error = futuro.exception()
+                if error is not None:
+                    cola.put_nowait({"evento": "error", "job": job, "mensaje": repr(error)})
+            
+            futuro.add_done_callback(informar_error)
+
+            while True:
+                evento = await cola.get()
+                await _enviar(writer, evento)
+                if evento["evento"] in ("resultado", "error"):
+                    break
+        finally:
+            self.trabajos.pop(job, None)
+
+
+async def _enviar(writer, evento):
+    writer.write((json.dumps(evento, default=_json_default) + "\n").encode())
+    await writer.drain()
+
+
+def _json_default(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    raise TypeError(f"{type(valor)} no es serializable")
+
+
+async def resolver_remoto(trabajo, host="127.0.0.1", port=8765):
+    """
+    Cliente del servidor: envía un trabajo y devuelve sus eventos a medida que llegan.
+
+    Args:
+        trabajo (dict): Trabajo con el formato descripto en el módulo.
+        host (str, optional): Dirección del servidor. Defaults to "127.0.0.1".
+        port (int, optional): Puerto del servidor. Defaults to 8765.
+
+    Yields:
+        dict: Eventos del trabajo, terminando con "resultado" o "error".
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await _enviar(writer, trabajo)
+        while True:
+            linea = await reader.readline()
+            if not linea:
+                break
+            evento = json.loads(linea)
+            yield evento
+            if evento["evento"] in ("resultado", "error"):
+                break
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+# Estado de cada proceso del pool.
+_cola = None
+_cache = collections.OrderedDict()
+_cache_size = 8
+
+
+def _iniciar_worker(cola, cache_size):
+    global _cola, _cache_size
+    _cola = cola
+    _cache_size = cache_size
+
+
+def _calentar():
+    return os.getpid()
+
+
+def _get_ruteo(trabajo):
+    """
+    Devuelve el Ruteo del trabajo sin solución, reutilizando el del caché del proceso si ya se construyó para la misma
+    flota, pedidos y parámetros (así no se recalculan distancias, vecinos ni máscaras). Con otros pedidos, aunque la
+    flota sea la misma, el Ruteo se construye de nuevo.
+
+    Returns:
+        tuple: Ruteo y si se obtuvo del caché.
+    """
+    datos = [trabajo["camiones"], trabajo["pedidos"], trabajo["costo_oportunidad"], trabajo["presupuesto"],
+             trabajo.get("indice", "auto")]
+    clave = hashlib.sha256(json.dumps(datos, sort_keys=True, default=str).encode()).hexdigest()
+
+    if clave in _cache:
+        _cache.move_to_end(clave)
+        return (_cache[clave], True)
+
+    ruteo = Ruteo.from_frame(pd.DataFrame(trabajo["camiones"]), pd.DataFrame(trabajo["pedidos"]),
+                             costo_oportunidad=trabajo["costo_oportunidad"], presupuesto=trabajo["presupuesto"],
+                             indice=trabajo.get("indice", "auto"))
+
+    _cache[clave] = ruteo
+    if len(_cache) > _cache_size:
+        _cache.popitem(last=False)
+
+    return (ruteo, False)
+
+
+def _resolver_trabajo(job, trabajo):
+    """
+    Resuelve un trabajo en un proceso del pool. Todos los eventos, incluido el resultado, se envían por la cola para
+    que lleguen en orden.
+    """
+    try:
+        _cola.put({"evento": "inicio", "job": job, "pid": os.getpid()})
+
+        ruteo_base, cache = _get_ruteo(trabajo)
+        ruteo = copy.deepcopy(ruteo_base)
+        params = dict(trabajo.get("params", {}))
+        params.setdefault("history_mode", None)
+        ruteo.get_solucion_inicial(mode=trabajo.get("sol_inicial_mode", "simple"), random_state=params.get("random_state", 1),
+                                   asignacion=trabajo.get("asignacion"))
+
+        callback = lambda progreso: _cola.put(dict(progreso, evento="progreso", job=job))
+        best_sol, history = mh.sa(ruteo, progreso=False, callback=callback, **params)
+
+        resumen = best_sol.summary_ruteo(time=history["time"], iters=history["iters"]).iloc[:, 0].to_dict()
+        _cola.put({"evento": "resultado",
+                   "job": job,
+                   "costo_total_tn": best_sol.costo_total_tn,
+                   "asignacion": [[ix_pedido, ix_camion] for ix_pedido, ix_camion in best_sol.get_asignacion().items()],
+                   "resumen": resumen,
+                   "motivo_fin": history.get("motivo_fin"),
+                   "cache": cache})
+
+    except Exception as error:
+        _cola.put({"evento": "error", "job": job, "mensaje": repr(error)})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local de optimización de ruteos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="Cantidad de procesos. Por defecto los núcleos disponibles.")
+    parser.add_argument("--cache", type=int, default=8, help="Ruteos precalculados que guarda cada proceso.")
+    args = parser.parse_args(argv)
+
+    servidor = ServidorRuteo(host=args.host, port=args.port, max_workers=args.workers, cache_size=args.cache)
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import hashlib
+import os
 import pandas as pd
 from pathlib import Path
 
@@ -18,7 +20,98 @@ def preparar_df_pedidos(df_pedidos, pedido):
 
     return df_pedido
 
-def load_inputs(sheet) -> pd.DataFrame:
-    module_path: Path = Path(__file__)
-    file_path: Path = (module_path / "../../data/inputs/data_inputs.xlsx").resolve()
-    return pd.read_excel(file_path, sheet_name=sheet)
\ No newline at end of file
+INPUTS_PATH: Path = (Path(__file__) / "../../data/inputs/data_inputs.xlsx").resolve()
+
+# Libros ya cargados en este proceso, identificados por ruta, fecha de modificación y tamaño.
+_libros = {}
+
+
+def load_inputs(sheet, file_path=None, cache=True) -> pd.DataFrame:
+    """
+    Carga una hoja del excel de inputs. El libro completo se lee una única vez y se guarda en una caché binaria
+    (ver load_workbook()), por lo que cargar varias hojas no vuelve a leer el excel.
+
+    Args:
+        sheet (str): Nombre de la hoja.
+        file_path (str or Path, optional): Excel de inputs. Defaults to None (data/inputs/data_inputs.xlsx).
+        cache (bool, optional): Usa la caché. Con False se lee la hoja directamente del excel. Defaults to True.
+
+    Returns:
+        pd.DataFrame: Dataframe con la hoja pedida.
+    """
+    file_path = INPUTS_PATH if file_path is None else Path(file_path)
+
+    if not cache:
+        return pd.read_excel(file_path, sheet_name=sheet)
+
+    # Se devuelve una copia para que modificar el DataFrame no altere la caché.
+    return load_workbook(file_path)[sheet].copy()
+
+
+def load_workbook(file_path=None):
+    """
+    Carga todas las hojas de un excel, leyéndolo sólo si cambió desde la última lectura:
+        1. Si ya se cargó en este proceso con la misma fecha de modificación y tamaño se usa esa carga.
+        2. Si existe la caché en disco (carpeta .cache junto al excel) para el mismo contenido se carga de ahí.
+           El contenido se compara por fecha de modificación y tamaño y, si difieren, por el hash del archivo.
+        3. Si no, se lee el excel y se guarda la caché.
+
+    Args:
+        file_path (str or Path, optional): Excel de inputs. Defaults to None (data/inputs/data_inputs.xlsx).
+
+    Returns:
+        dict: Diccionario con un DataFrame por hoja.
+    """
+    file_path = (INPUTS_PATH if file_path is None else Path(file_path)).resolve()
+    stat = file_path.stat()
+    clave = (str(file_path), stat.st_mtime_ns, stat.st_size)
+
+    if clave in _libros:
+        return _libros[clave]
+
+    cache_path = file_path.parent / ".cache" / (file_path.name + ".pkl")
+    metadatos = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    libro = None
+
+    if cache_path.exists():
+        # Una caché corrupta, de otra versión de pandas o con otro formato se trata como inexistente.
+        try:
+            cacheado = pd.read_pickle(cache_path)
+            if all(cacheado[k] == v for k, v in metadatos.items()):
+                libro = cacheado["hojas"]
+            else:
+                # El archivo pudo ser modificado sin cambiar su contenido (por ejemplo al copiarlo).
+                metadatos["sha256"] = _hash_archivo(file_path)
+                if cacheado["sha256"] == metadatos["sha256"]:
+                    libro = cacheado["hojas"]
+                    _guardar_cache(cache_path, libro, metadatos)
+        except Exception:
+            libro = None
+
+    if libro is None:
+        libro = pd.read_excel(file_path, sheet_name=None)
+        metadatos.setdefault("sha256", _hash_archivo(file_path))
+        _guardar_cache(cache_path, libro, metadatos)
+
+    _libros[clave] = libro
+
+    return libro
+
+
+def _hash_archivo(file_path):
+    return hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+
+
+def _guardar_cache(cache_path, libro, metadatos):
+    """
+    Guarda la caché de un libro. Si no se puede escribir (por ejemplo en una carpeta de sólo lectura) se sigue sin caché en disco.
+    El archivo se escribe primero en un temporal que luego lo reemplaza, para que un corte durante la escritura
+    no deje una caché a medio escribir.
+    """
+    tmp = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        pd.to_pickle(dict(metadatos, hojas=libro), tmp)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
\ No newline at end of file
@@ -1,4 +1,4 @@
 from setuptools import setup, find_packages
 
 # setup mínimo.
-setup(name='logistica', version='1.0', packages=find_packages())
\ No newline at end of file
+setup(name='logistica', version='1.0', packages=find_packages(exclude=["benchmarks"]))
\ No newline at end of file